@@ -3,6 +3,18 @@ from altair import value
 import streamlit as st
 from Pages.Component.summary_statistics import summary_statistics
 from Component.chart_components import *
+from Component.instrumentation import start_rerun, finish_rerun, span, traced_fragment, diagnostics_enabled, render_diagnostics_panel
+from Component.figure_builder import build_figures
+from Component.data_loader import load_catalog, load_dataframe_for_subtopic, load_nutrient_datasets
+from Component.warmup import start_warmup
+from Component.correlation import METHODS, correlation_report
+from Component.panel import POPULATION, selection_view, indicator_long
+from Component.hierarchy import hierarchy_totals
+from Component.incremental import incremental_filter, selection_totals
+from Component.manifest import dataset_version, frame_key
+from Component.data_table import paged_table, browse_datasets
+from Component.export import EXPORT_FORMATS, subtopic_frames, export_file
+from Component.resolution import RESOLUTION_OPTIONS, PIXELS_PER_BAR, MAX_ANIMATION_FRAMES, point_budget, time_resolution
 import pandas as pd
 import numpy as np
 import plotly.express as px
@@ -20,57 +32,14 @@ st.set_page_config(
     layout="wide",
     initial_sidebar_state="expanded"
 )
+# Every stage below records a timing span into this rerun's trace (see the ?diagnostics=1 panel)
+rerun_trace = start_rerun()
+# Pre-loads the datasets and default figures in the background (once per process)
+start_warmup()
 # ============================================================================
 # DATA LOADING ( D:\Semester 4\Data Visualization\OECDDashBoard> C:/Users/xuant/AppData/Local/Microsoft/WindowsApps/python3.11.exe -m streamlit run "Pages\2_dashboard.py")
 # ============================================================================
 BASE_DIR = Path(__file__).parent.parent / 'DataSource'
-@st.cache_data
-def load_dataframe_for_subtopic(topic: str = 'Greenhouse Gas Output') -> dict[str, pd.DataFrame]:
-    """Load all greenhouse gas datasets with error handling"""
-    datasets: dict[str, pd.DataFrame] = {}
-    topic_map = {
-        'Greenhouse Gas Output': {
-            'Without LULUCF':       BASE_DIR / 'GreenHouseGas' / 'GreenHouseGasWithoutLULUCF.csv',
-            'From LULUCF':          BASE_DIR / 'GreenHouseGas' / 'GreenHouseGasFromLULUCF.csv',
-            'With LULUCF':          BASE_DIR / 'GreenHouseGas' / 'GreenHouseGasWithLULUCF.csv',
-            'Sector':           BASE_DIR / 'GreenHouseGas' / 'GreenHouseGasBySectors.csv',
-            'Nature Source':    BASE_DIR / 'GreenHouseGas' / 'GreenHouseGasByNatureSources.csv',
-        },
-        'Nutrient Input and Output': {},
-    }
-
-    if topic == 'Greenhouse Gas':
-        files_dict = topic_map['Greenhouse Gas Output']
-        for subtopic, file_path in files_dict.items():
-            try:
-                df = pd.read_csv(file_path)
-                datasets[subtopic] = df
-            except Exception as e:
-                st.error(f"Error loading {subtopic}: {e}")
-    else:
-        st.error(f"Data for '{topic}' is not yet implemented.")
-    return datasets
-
-@st.cache_data
-def load_dataframe_for_interested_correlational_env_indicator(indicator: str) -> pd.DataFrame:
-    """Load environmental indicator datasets for correlation analysis"""
-    topic_map = {
-        'Agricultural Energy Consumption (Tonnes of oil equivalent)': BASE_DIR / 'Energy' / 'AgriculturalEnergyConsumption.csv',
-        'Agricultural Land Area (Hectares)': BASE_DIR / 'Land' / 'AgriculturalLand.csv',
-        'Agricultural Water Use (Cubic meters)': BASE_DIR / 'WaterAbstraction' / 'AgriculturalWaterAbstraction.csv',
-    }
-    
-    file_path = topic_map.get(indicator)
-    if file_path and file_path.exists():
-        try:
-            df = pd.read_csv(file_path)
-            return df
-        except Exception as e:
-            st.error(f"Error loading {indicator}: {e}")
-            return pd.DataFrame()
-    else:
-        st.error(f"Data for '{indicator}' is not available or file not found.")
-        return pd.DataFrame()
 
 # ============================================================================
 # Components
@@ -83,9 +52,18 @@ def user_config(df: pd.DataFrame)-> dict[str, list]:
     year_range = st.sidebar.select_slider(
         "Select Year Range",
         options=all_years,
-        value=(min(all_years), max(all_years))
+        value=(min(all_years), max(all_years)),
+        key="year_range_slider"
+    )
+    # A range, not a list: the filters slice a contiguous block of the time-sorted dataset for it
+    selected_TIME_PERIOD = range(year_range[0], year_range[1] + 1)
+    # Charts with years on the x-axis (or as frames) average them into buckets when there are too many to show
+    st.sidebar.selectbox(
+        "Time Resolution",
+        RESOLUTION_OPTIONS,
+        key="time_resolution",
+        help="Auto aggregates years only when a chart has more of them than it can show"
     )
-    selected_TIME_PERIOD = list(range(year_range[0], year_range[1] + 1))
     
     # Countries selection with Select All button
     st.sidebar.markdown("**Select Countries**")
@@ -103,6 +81,9 @@ def user_config(df: pd.DataFrame)-> dict[str, list]:
     if select_all_countries:
         st.session_state.selected_countries = all_countries
         valid_selected_countries = all_countries
+    # The widget's own state overrides `default`, so drop it when it is stale (Select All or a subtopic without these countries)
+    if select_all_countries or any(country not in all_countries for country in st.session_state.get('countries_multiselect', [])):
+        st.session_state.pop('countries_multiselect', None)
     
     selected_REF_AREA = st.sidebar.multiselect(
         "",
@@ -130,6 +111,8 @@ def user_config(df: pd.DataFrame)-> dict[str, list]:
     if select_all_measures:
         st.session_state.selected_measures = all_measures
         valid_selected_measures = all_measures
+    if select_all_measures or any(measure not in all_measures for measure in st.session_state.get('measures_multiselect', [])):
+        st.session_state.pop('measures_multiselect', None)
     
     selected_MEASURE = st.sidebar.multiselect(
         "",
@@ -147,119 +130,18 @@ def user_config(df: pd.DataFrame)-> dict[str, list]:
         "selected_MEASURE": selected_MEASURE
     }
 
-def filter_data(df: pd.DataFrame, user_config: dict[str, str]) -> pd.DataFrame:
-    selected_TIME_PERIOD = user_config.get("selected_TIME_PERIOD", np.arange(2012, 2021).tolist())
-    selected_REF_AREA = user_config.get("selected_REF_AREA", ["USA"])
-    selected_MEASURE = user_config.get("selected_MEASURE", [])
-    # Filter the DataFrame for the selected TIME_PERIOD, REF_AREA, and MEASURE
-    df = df[(df['TIME_PERIOD'].isin(selected_TIME_PERIOD)) & (df['REF_AREA'].isin(selected_REF_AREA)) & (df['MEASURE'].isin(selected_MEASURE))]
-    return df
-
 # ============================================================================
-# initialize session state
+# SECTIONS
 # ============================================================================
-if 'topic' not in st.session_state:
-    st.session_state.topic = None
-if 'subtopic' not in st.session_state:
-    st.session_state.subtopic = None
-if 'user_config' not in st.session_state:
-    st.session_state.user_config = None
-# ============================================================================
-# MAIN DISPLAY
-# ============================================================================
-st.title("OECD Dashboard for Agricultural-Economic Data 🌍")
+# Each section is a fragment: a widget inside it reruns only that section, while the topic, subtopic and sidebar
+# filters still rerun the whole page. Fragment reruns reuse the arguments of the last full run.
+@traced_fragment('summary')
+def summary_section(df_filtered: pd.DataFrame, totals: pd.DataFrame):
+    with span('summary_statistics'):
+        summary_statistics(df_filtered, totals)
 
-# Style the topic selection with larger text
-st.markdown("""
-<style>
-    .stSelectbox > label {
-        font-size: 24px !important;
-        font-weight: bold !important;
-        color: #fafafa !important;
-    }
-    .stSelectbox > div > div > div {
-        font-size: 18px !important;
-    }
-</style>
-""", unsafe_allow_html=True)
-st.markdown("### 📊 Select Topic", unsafe_allow_html=True)
-available_topics = ['Greenhouse Gas', 'Nutrient Input and Output']
-st.session_state.topic = st.selectbox("", available_topics, key="topic_select") 
-if st.session_state.topic == 'Greenhouse Gas':
-    col1, col2 = st.columns(2)
-    with col1:
-        st.markdown("#### 🔍 Select Subtopic", unsafe_allow_html=True)
-        st.session_state.subtopic = st.selectbox("", ['Without LULUCF', 'From LULUCF', 'With LULUCF', 'Sector', 'Nature Source'], index=0, key="subtopic_select")
-        # Display styled explanation for each subtopic
-        subtopic_info = {
-            'Without LULUCF': {
-                'icon': '🏭',
-                'title': 'Greenhouse Gas Output (Excluding LULUCF)',
-                'description': 'This analysis focuses on Greenhouse Gas Output excluding Land Use, Land-Use Change, and Forestry (LULUCF). It covers GHS output from industrial, energy, agriculture, and waste sectors.',
-                'color': '#ff6b6b'
-            },
-            'From LULUCF': {
-                'icon': '🌳',
-                'title': 'Greenhouse Gas Output (From LULUCF)',
-                'description': 'This analysis focuses on Greenhouse Gas Output specifically from Land Use, Land-Use Change, and Forestry (LULUCF). It includes GHS output and carbon sequestration from forests and land conversion.',
-                'color': '#4ecdc4'
-            },
-            'With LULUCF': {
-                'icon': '🌍',
-                'title': 'Total Greenhouse Gas Output (Including LULUCF)',
-                'description': 'This comprehensive analysis includes Greenhouse Gas Output from all sources, including Land Use, Land-Use Change, and Forestry (LULUCF). It provides the complete picture of net change in greenhouse gas output.',
-                'color': '#45b7d1'
-            },
-            'Sector': {
-                'icon': '🏗️',
-                'title': 'Greenhouse Gas Output by Sectors',
-                'description': 'This analysis breaks down Greenhouse Gas Output by economic sectors such as energy, industry, agriculture, transport, and waste. It helps identify which sectors contribute most to GHS output.',
-                'color': '#f39c12'
-            },
-            'Nature Source': {
-                'icon': '⚗️',
-                'title': 'Greenhouse Gas Output by Nature Sources',
-                'description': 'This analysis categorizes Greenhouse Gas Output by the natural sources such as cropland, grassland, wetlands, and other ecosystems. It helps understand the role of nature in greenhouse gas absorption and GHS output.',
-                'color': '#9b59b6'
-            }
-        }
-        current_info = subtopic_info[st.session_state.subtopic]
-        st.markdown(f"""
-        <div style="
-            background-color: #0e1117;
-            padding: 20px;
-            border-radius: 10px;
-            border-left: 5px solid {current_info['color']};
-            margin: 20px 0;
-            border: 1px solid #262730;
-        ">
-            <div style="display: flex; align-items: center; margin-bottom: 15px;">
-                <span style="font-size: 24px; margin-right: 15px;">{current_info['icon']}</span>
-                <span style="font-weight: bold; font-size: 20px; color: #fafafa;">{current_info['title']}</span>
-            </div>
-            <div style="color: #a3a8b8; font-size: 16px; line-height: 1.5;">
-                {current_info['description']}
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
-    with col2:
-        st.markdown(
-            """
-            <div style="text-align: center;">
-            <h4>🌐 Overview of Subtopic</h4>
-            </div>
-            """,
-            unsafe_allow_html=True
-        )
-        st.plotly_chart(sunburst(), use_container_width=True)
-    dfs_all_subtopics = load_dataframe_for_subtopic(st.session_state.topic) # contain { 'Without LULUCF': df1, 'From LULUCF': df2, 'With LULUCF': df3, 'Sector': df4, 'Nature Source': df5 }
-    df_selected_subtopic = dfs_all_subtopics.get(st.session_state.subtopic)
-    st.session_state.user_config = user_config(df_selected_subtopic)
-    df_filtered = filter_data(df_selected_subtopic, st.session_state.user_config)
-    #section 2: display summary statistics 
-    summary_statistics(df_filtered)
-    #section 3: display static map and animated map
-    
+@traced_fragment('geographic view')
+def geographic_view(df_filtered: pd.DataFrame):
     # Geographic View section with enhanced styling
     st.markdown("""
     <div style="text-align: center; margin: 40px 0 30px 0;">
@@ -300,11 +182,55 @@ if st.session_state.topic == 'Greenhouse Gas':
         index=63  # 'orthographic' is at index 63 in the list, set as default
     )
     st.toggle(" Accumulative View / Annual View", value=False, key="accumulated_ghs_toggle")
-    if st.session_state.accumulated_ghs_toggle == False:
-        st.plotly_chart(static_map(df_filtered, st.session_state.projection_type), use_container_width=True, key="static_map")
+    with span('map'):
+        # Maps are cached without a projection: browsing projections only swaps layout.geo on the cached figure
+        if st.session_state.accumulated_ghs_toggle == False:
+            fig_map = cached_chart(static_map)(df_filtered)
+            st.plotly_chart(set_projection(fig_map, st.session_state.projection_type), use_container_width=True, key="static_map")
+        else:
+            # One choropleth per frame: long ranges are bucketed to a frame budget
+            df_frames, frames_note = time_resolution(df_filtered, MAX_ANIMATION_FRAMES, st.session_state.get('time_resolution', 'Auto'))
+            fig_map = cached_chart(animated_map)(df_frames)
+            st.plotly_chart(set_projection(fig_map, st.session_state.projection_type), use_container_width=True, key="animated_map")
+            if frames_note:
+                st.caption(frames_note)
+
+def export_section(df_filtered: pd.DataFrame):
+    # Files are only written when a button is clicked, chunk by chunk, so building them costs nothing on reruns
+    col_export1, col_export2, col_export3 = st.columns([4, 1, 1])
+    with col_export1:
+        export_all = st.checkbox("Export all subtopics (selected years and countries, every measure)", key="export_all_subtopics")
+    if export_all:
+        datasets, config = load_dataframe_for_subtopic(), st.session_state.user_config
+        export_frames = lambda: subtopic_frames(datasets, config)
+        file_stem = "oecd_ghg_all_subtopics"
     else:
-        st.plotly_chart(animated_map(df_filtered, st.session_state.projection_type), use_container_width=True, key="animated_map")
-    
+        export_frames = lambda: [(None, df_filtered)]
+        file_stem = "oecd_ghg_" + re.sub(r'\W+', '_', st.session_state.subtopic or 'selection').strip('_').lower()
+    for column, (export_format, (extension, mime)) in zip((col_export2, col_export3), EXPORT_FORMATS.items()):
+        with column:
+            st.download_button(
+                f"⬇️ {export_format}",
+                data=lambda export_format=export_format: export_file(export_frames(), export_format),
+                file_name=f"{file_stem}.{extension}",
+                mime=mime,
+                on_click="ignore",
+                key=f"download_{extension}"
+            )
+
+# Paging and sorting the table reruns only the table, not the charts around it
+@traced_fragment('data table')
+def data_table_section(df_subtopic: pd.DataFrame, df_filtered: pd.DataFrame):
+    # The dataset's (version, topic, subtopic) key picks its cached sort permutations
+    paged_table(df_subtopic, df_filtered, frame_key(df_subtopic), key="analytical_table")
+
+# Filtering and paging the nutrient rows reruns only the table
+@traced_fragment('nutrient data')
+def nutrient_data_view(all_dfs):
+    browse_datasets(all_dfs, key="nutrient_table")
+
+@traced_fragment('analytical view')
+def analytical_view(df_filtered: pd.DataFrame, df_subtopic: pd.DataFrame):
     # Analytical View section with enhanced styling
     st.markdown("""
     <div style="text-align: center; margin: 40px 0 30px 0;">
@@ -338,64 +264,167 @@ if st.session_state.topic == 'Greenhouse Gas':
     </div>
     """, unsafe_allow_html=True)
     
-    st.write(df_filtered[['TIME_PERIOD', 'REF_AREA', 'MEASURE', 'OBS_VALUE']].sort_values(by=['TIME_PERIOD', 'REF_AREA', 'MEASURE']).reset_index(drop=True))
-    # Styled chart configuration section
-    st.markdown("### ⚙️ Chart Customization", unsafe_allow_html=True)     
-    col_config1, col_config2, col_config3 = st.columns([4,2,4])
+    # Closed sections are not computed at all; opening one reruns only this fragment
+    analytical_expander = st.expander("🧮 Show analytical charts", key="analytical_view_expander", on_change="rerun")
+    if not analytical_expander.open:
+        return
+    with analytical_expander, span('analytical charts'):
+        data_table_section(df_subtopic, df_filtered)
+        export_section(df_filtered)
+        # Styled chart configuration section
+        st.markdown("### ⚙️ Chart Customization", unsafe_allow_html=True)     
+        col_config1, col_config2, col_config3 = st.columns([4,2,4])
     
-    with col_config1:
-        x_axis_options = ['REF_AREA', 'MEASURE', 'TIME_PERIOD']
+        with col_config1:
+            x_axis_options = ['REF_AREA', 'MEASURE', 'TIME_PERIOD']
         
-        selected_x_axis = st.selectbox("X-Axis Variable", x_axis_options, key="x_axis_select")
-    with col_config2:
-        y_axis_options = ['GHS Output']
-        selected_y_axis = st.selectbox("Y-Axis Variable", y_axis_options, key="y_axis_select")
-    with col_config3:
-        # Filter out the selected x_axis option to prevent same selection
-        category_options = ['MEASURE', 'REF_AREA']
-        available_category_options = [opt for opt in category_options if opt != selected_x_axis]
-        selected_category = st.selectbox("Category to compare", available_category_options, key="category_select")
+            selected_x_axis = st.selectbox("X-Axis Variable", x_axis_options, key="x_axis_select")
+        with col_config2:
+            y_axis_options = ['GHS Output']
+            selected_y_axis = st.selectbox("Y-Axis Variable", y_axis_options, key="y_axis_select")
+        with col_config3:
+            # Filter out the selected x_axis option to prevent same selection
+            category_options = ['MEASURE', 'REF_AREA']
+            available_category_options = [opt for opt in category_options if opt != selected_x_axis]
+            selected_category = st.selectbox("Category to compare", available_category_options, key="category_select")
     
-    # Display category name based on selection
-    category_name_map = {
-        'MEASURE': 'GHS Gas Type',
-        'REF_AREA': 'Country'
-    }
-    selected_category_name = category_name_map.get(selected_category, 'Category')
-    # Toggle button with custom styling and icon
-    col1, col2 = st.columns(2)
-    with col1:
-        toggle_button_1 = st.toggle("📈 Value-perspective view / 🔢 Percentage-perspective view", value=False, key="toggle_button_1")
-        if toggle_button_1 == False:
-            st.plotly_chart(bar_line(df_filtered, selected_x_axis, selected_category, selected_category_name), use_container_width=True, key="main_bar_chart")
-        else:
-            st.plotly_chart(percentage_bar_line(df_filtered, selected_x_axis, selected_category, selected_category_name), use_container_width=True, key="main_percentage_chart")
-    with col2:
-        toggle_button_2 = st.toggle("🌳 Tree Map / 🥧 Pie Chart", value=False, key="toggle_button_2")
-        # Positive/Negative value filter for pie charts and tree maps
-        value_filter = st.selectbox(" Additional configuration for pie charts/ tree maps",
-                                   ["Show all contributors to GHS Emissions","Show all contributors to GHS Absorption"],
-                                   key="value_filter_select", width=300)
-        if toggle_button_2 == True:
-            st.plotly_chart(tree_map(df_filtered, selected_category, selected_category_name, value_filter), use_container_width=True, key="tree_map_1")
-        elif toggle_button_2 == False:
-            st.plotly_chart(pie(df_filtered, selected_category, selected_category_name, value_filter), use_container_width=True, key="pie_chart_1")
-    col1, col2 = st.columns(2)
-    with col1:
-        # Add icon to the toggle label for better visual cue
-        toggle_button_3 = st.toggle("📊 Multi-Line Chart / 🟦 Area-Line Chart", value=False, key="toggle_button_3")
-        chart_type = "area" if toggle_button_3 else "line"
-        # Check for negative values in the OBS_VALUE column instead of categorical column
-        min_obs_value = df_filtered['OBS_VALUE'].min()
-        if min_obs_value < 0:
-            st.warning(f"Warning: The selected data contains negative values, and thus the area chart is not applicable. Please use the multi-line chart instead.")
-            st.plotly_chart(multi_line(df_filtered, selected_x_axis, selected_category, selected_category_name, "line"), use_container_width=True, key="multi_line_chart")
+        # Display category name based on selection
+        category_name_map = {
+            'MEASURE': 'GHS Gas Type',
+            'REF_AREA': 'Country'
+        }
+        selected_category_name = category_name_map.get(selected_category, 'Category')
+        # Both views of each chart in one figure: its buttons switch views in the browser instead of rerunning
+        client_views = st.toggle("⚡ Switch chart views in the browser", value=False, key="client_side_views",
+                                 help="Value/percentage, pie/tree map and line/area are switched by buttons on the charts, without a rerun")
+        # Toggle button with custom styling and icon
+        # The widgets come first; the four figures are then built concurrently and placed under their widgets
+        col1, col2 = st.columns(2)
+        with col1:
+            toggle_button_1 = False if client_views else st.toggle("📈 Value-perspective view / 🔢 Percentage-perspective view", value=False, key="toggle_button_1")
+        with col2:
+            toggle_button_2 = False if client_views else st.toggle("🌳 Tree Map / 🥧 Pie Chart", value=False, key="toggle_button_2")
+            # Positive/Negative value filter for pie charts and tree maps
+            value_filter = st.selectbox(" Additional configuration for pie charts/ tree maps",
+                                       ["Show all contributors to GHS Emissions","Show all contributors to GHS Absorption"],
+                                       key="value_filter_select", width=300)
+        col3, col4 = st.columns(2)
+        with col3:
+            # Add icon to the toggle label for better visual cue
+            toggle_button_3 = False if client_views else st.toggle("📊 Multi-Line Chart / 🟦 Area-Line Chart", value=False, key="toggle_button_3")
+            chart_type = "area" if toggle_button_3 else "line"
+            # Check for negative values in the OBS_VALUE column instead of categorical column
+            min_obs_value = df_filtered['OBS_VALUE'].min()
+            if min_obs_value < 0:
+                st.warning(f"Warning: The selected data contains negative values, and thus the area chart is not applicable. Please use the multi-line chart instead.")
+                chart_type = "line"
+        # Years on the x-axis are bucketed to what the chart width can show; on "Auto" the line chart keeps every
+        # year and thins long series itself (shape-preserving) instead of averaging them
+        resolution = st.session_state.get('time_resolution', 'Auto')
+        df_main, main_note = time_resolution(df_filtered, point_budget(700, PIXELS_PER_BAR), resolution) if selected_x_axis == 'TIME_PERIOD' else (df_filtered, None)
+        df_trend, trend_note = time_resolution(df_filtered, None, resolution)
+        if client_views:
+            main_builder, share_builder = bar_line_views, share_views
         else:
-            st.plotly_chart(multi_line(df_filtered, selected_x_axis, selected_category, selected_category_name, chart_type), use_container_width=True, key="multi_line_chart")
-    with col2:
-        st.plotly_chart(animated_hor_bar(df_filtered, selected_category), use_container_width=True, key="animated_horizontal_bar_chart")
+            main_builder, share_builder = (percentage_bar_line if toggle_button_1 else bar_line), (tree_map if toggle_button_2 else pie)
+        # With negative values in the selection the area view does not apply, so only the line chart is shipped
+        trend_job = (cached_chart(trend_views), df_trend, selected_x_axis, selected_category, selected_category_name) if client_views and min_obs_value >= 0 \
+            else (cached_chart(multi_line), df_trend, selected_x_axis, selected_category, selected_category_name, chart_type)
+        figures = build_figures({
+            'main': (cached_chart(main_builder), df_main, selected_x_axis, selected_category, selected_category_name),
+            'share': (cached_chart(share_builder), df_filtered, selected_category, selected_category_name, value_filter),
+            'trend': trend_job,
+            'race': (cached_chart(animated_hor_bar), df_filtered, selected_category),
+        })
+        with col1:
+            st.plotly_chart(figures['main'], use_container_width=True, key="main_views_chart" if client_views else "main_percentage_chart" if toggle_button_1 else "main_bar_chart")
+            if main_note:
+                st.caption(main_note)
+        with col2:
+            st.plotly_chart(figures['share'], use_container_width=True, key="share_views_chart" if client_views else "tree_map_1" if toggle_button_2 else "pie_chart_1")
+        with col3:
+            st.plotly_chart(figures['trend'], use_container_width=True, key="multi_line_chart")
+            if trend_note:
+                st.caption(trend_note)
+        with col4:
+            st.plotly_chart(figures['race'], use_container_width=True, key="animated_horizontal_bar_chart")
+
+@traced_fragment('correlation view')
+def correlation_view(env_factor: str):
+    view_expander = st.expander("🔗 Show correlation charts", key="correlation_view_expander", on_change="rerun")
+    if not view_expander.open:
+        return
+    with view_expander, span('correlation'):
+        # GHS totals, the factor and population of the selected country-years, read from the materialized panel
+        df_view = selection_view(st.session_state.user_config, st.session_state.subtopic, [env_factor, POPULATION])
+        # Main correlation visualization
+        st.markdown("<br>", unsafe_allow_html=True)  # Add some spacing
+        # Style the toggle with better visual representation
+        view_toggle = st.toggle(
+            "📊 Static View / 🎬 Animated View", 
+            value=False, 
+            key="accumulated_env_toggle"
+        )
     
+        # Add explanatory text for the toggle
+        if view_toggle:
+            st.markdown("""
+            <div style="color: #a3a8b8; font-size: 12px; margin-top: 10px;">
+                🎬 <strong>Animated Mode:</strong> Shows evolution over time
+            </div>
+            """, unsafe_allow_html=True)
+        else:
+            st.markdown("""
+            <div style="color: #a3a8b8; font-size: 12px; margin-top: 10px;">
+                📊 <strong>Static Mode:</strong> Shows cumulative relationship
+            </div>
+            """, unsafe_allow_html=True)
+
+        if st.session_state.accumulated_env_toggle == False:
+            st.plotly_chart(cached_chart(static_bubble)(df_view, env_factor), use_container_width=True, key="static_bubble_chart")
+        else:
+            st.plotly_chart(cached_chart(animated_bubble)(df_view, env_factor), use_container_width=True, key="animated_bubble_chart")
+
+@traced_fragment('environmental breakdown')
+def environmental_breakdown(env_factor: str):
+    # Environmental factor breakdown section
+    st.markdown("### 📋 Environmental Factor Breakdown Per Country (REF_AREA)", unsafe_allow_html=True)
+    breakdown_expander = st.expander("📋 Show breakdown", key="environmental_breakdown_expander", on_change="rerun")
+    if not breakdown_expander.open:
+        return
+    with breakdown_expander, span('waterfall'):
+        # The factor on the selected country-years, in the long layout the waterfall pivots
+        df_view = selection_view(st.session_state.user_config, st.session_state.subtopic, [env_factor])
+        df_env = indicator_long(df_view, env_factor)
+        st.plotly_chart(cached_chart(water_fall)(df_env, 'REF_AREA', 'MEASURE', env_factor), use_container_width=True, key="waterfall_chart")
+
+@traced_fragment('correlation statistics')
+def correlation_statistics():
+    # Coefficients for every factor at once, cached per filter configuration, so switching factors costs nothing
+    stats_expander = st.expander("📐 Show correlation statistics (all factors)", key="correlation_stats_expander", on_change="rerun")
+    if not stats_expander.open:
+        return
+    with stats_expander, span('correlation statistics'):
+        config = st.session_state.user_config
+        report = correlation_report(dataset_version(), st.session_state.subtopic, tuple(config['selected_TIME_PERIOD']),
+                                    tuple(config['selected_REF_AREA']), tuple(config['selected_MEASURE']))
+        col_method, col_breakdown = st.columns(2)
+        with col_method:
+            method = st.selectbox("Coefficient", METHODS, key="correlation_method")
+        with col_breakdown:
+            breakdown = st.selectbox("Breakdown", ['Per country', 'Rolling windows'], key="correlation_breakdown")
+        report = report[report['method'] == method]
+        overall = report[report['scope'] == 'overall']
+        for column, (_, row) in zip(st.columns(max(len(overall), 1)), overall.iterrows()):
+            column.metric(row['factor'].split(' (')[0], "–" if pd.isna(row['r']) else f"{row['r']:+.2f}", help=f"{method} over all selected countries and years ({row['n']} pairs)")
+        scope = 'country' if breakdown == 'Per country' else 'rolling'
+        st.plotly_chart(cached_chart(correlation_heatmap)(report[report['scope'] == scope], method, breakdown), use_container_width=True, key="correlation_heatmap")
+        st.caption("Rolling windows pool the selected countries over consecutive years; fewer than 3 pairs give no coefficient")
+
+@traced_fragment('correlation')
+def correlation_section():
     # section 4: Correlational analysis with enhanced styling
+    # The factor selectbox feeds both the bubble charts and the breakdown, so changing it reruns both nested fragments
     st.markdown("---")  # Add a separator line
     st.markdown("""
     <div style="text-align: center; margin: 30px 0;">
@@ -408,12 +437,10 @@ if st.session_state.topic == 'Greenhouse Gas':
     </div>
     """, unsafe_allow_html=True)
     
+    correlation_statistics()
+
     st.markdown("#### 🌱 Select Environmental Factor", unsafe_allow_html=True)
-    env_factor_options = [
-        'Agricultural Energy Consumption (Tonnes of oil equivalent)', 
-        'Agricultural Land Area (Hectares)', 
-        'Agricultural Water Use (Cubic meters)'
-    ]
+    env_factor_options = list(load_catalog()['Environmental Factors'].keys())
     
     # Add descriptions for each environmental factor
     factor_descriptions = {
@@ -441,7 +468,11 @@ if st.session_state.topic == 'Greenhouse Gas':
     )
     
     # Display factor description
-    factor_info = factor_descriptions[selected_env_factor]
+    factor_info = factor_descriptions.get(selected_env_factor, {
+        'icon': '🧪',
+        'description': 'Environmental factor added through the data catalog',
+        'color': '#95a5a6'
+    })
     st.markdown(f"""
     <div style="
         background-color: #0e1117;
@@ -457,45 +488,131 @@ if st.session_state.topic == 'Greenhouse Gas':
         </div>
     </div>
     """, unsafe_allow_html=True)
-    
-    # Load the environmental factor data
-    df_env = load_dataframe_for_interested_correlational_env_indicator(st.session_state.interested_correlational_env_factor)
-
-    # Main correlation visualization
-    st.markdown("<br>", unsafe_allow_html=True)  # Add some spacing
-    # Style the toggle with better visual representation
-    view_toggle = st.toggle(
-        "📊 Static View / 🎬 Animated View", 
-        value=False, 
-        key="accumulated_env_toggle"
-    )
-    
-    # Add explanatory text for the toggle
-    if view_toggle:
-        st.markdown("""
-        <div style="color: #a3a8b8; font-size: 12px; margin-top: 10px;">
-            🎬 <strong>Animated Mode:</strong> Shows evolution over time
-        </div>
-        """, unsafe_allow_html=True)
-    else:
-        st.markdown("""
-        <div style="color: #a3a8b8; font-size: 12px; margin-top: 10px;">
-            📊 <strong>Static Mode:</strong> Shows cumulative relationship
-        </div>
-        """, unsafe_allow_html=True)
 
-    if st.session_state.accumulated_env_toggle == False:
-        st.plotly_chart(static_bubble(df_filtered, df_env, st.session_state.interested_correlational_env_factor), use_container_width=True, key="static_bubble_chart")
-    else:
-        st.plotly_chart(animated_bubble(df_filtered, df_env, st.session_state.interested_correlational_env_factor), use_container_width=True, key="animated_bubble_chart")
+    # Both views load the environmental factor data themselves, only once they are opened
+    correlation_view(selected_env_factor)
+    environmental_breakdown(selected_env_factor)
 
-    
-    # Environmental factor breakdown section
-    st.markdown("### 📋 Environmental Factor Breakdown Per Country (REF_AREA)", unsafe_allow_html=True)
-    # Filter based on selected countries and time period only
-    df_env = df_env[df_env['REF_AREA'].isin(df_filtered['REF_AREA']) & df_env['TIME_PERIOD'].isin(df_filtered['TIME_PERIOD'])]
-    st.plotly_chart(water_fall(df_env, 'REF_AREA', 'MEASURE', st.session_state.interested_correlational_env_factor), use_container_width=True, key="waterfall_chart")
+# ============================================================================
+# initialize session state
+# ============================================================================
+if 'topic' not in st.session_state:
+    st.session_state.topic = None
+if 'subtopic' not in st.session_state:
+    st.session_state.subtopic = None
+if 'user_config' not in st.session_state:
+    st.session_state.user_config = None
+# ============================================================================
+# MAIN DISPLAY
+# ============================================================================
+st.title("OECD Dashboard for Agricultural-Economic Data 🌍")
 
+# Style the topic selection with larger text
+st.markdown("""
+<style>
+    .stSelectbox > label {
+        font-size: 24px !important;
+        font-weight: bold !important;
+        color: #fafafa !important;
+    }
+    .stSelectbox > div > div > div {
+        font-size: 18px !important;
+    }
+</style>
+""", unsafe_allow_html=True)
+st.markdown("### 📊 Select Topic", unsafe_allow_html=True)
+available_topics = ['Greenhouse Gas', 'Nutrient Input and Output']
+st.session_state.topic = st.selectbox("", available_topics, key="topic_select") 
+if st.session_state.topic == 'Greenhouse Gas':
+    col1, col2 = st.columns(2)
+    with col1:
+        st.markdown("#### 🔍 Select Subtopic", unsafe_allow_html=True)
+        st.session_state.subtopic = st.selectbox("", list(load_catalog()['Greenhouse Gas'].keys()), index=0, key="subtopic_select")
+        # Display styled explanation for each subtopic
+        subtopic_info = {
+            'Without LULUCF': {
+                'icon': '🏭',
+                'title': 'Greenhouse Gas Output (Excluding LULUCF)',
+                'description': 'This analysis focuses on Greenhouse Gas Output excluding Land Use, Land-Use Change, and Forestry (LULUCF). It covers GHS output from industrial, energy, agriculture, and waste sectors.',
+                'color': '#ff6b6b'
+            },
+            'From LULUCF': {
+                'icon': '🌳',
+                'title': 'Greenhouse Gas Output (From LULUCF)',
+                'description': 'This analysis focuses on Greenhouse Gas Output specifically from Land Use, Land-Use Change, and Forestry (LULUCF). It includes GHS output and carbon sequestration from forests and land conversion.',
+                'color': '#4ecdc4'
+            },
+            'With LULUCF': {
+                'icon': '🌍',
+                'title': 'Total Greenhouse Gas Output (Including LULUCF)',
+                'description': 'This comprehensive analysis includes Greenhouse Gas Output from all sources, including Land Use, Land-Use Change, and Forestry (LULUCF). It provides the complete picture of net change in greenhouse gas output.',
+                'color': '#45b7d1'
+            },
+            'Sector': {
+                'icon': '🏗️',
+                'title': 'Greenhouse Gas Output by Sectors',
+                'description': 'This analysis breaks down Greenhouse Gas Output by economic sectors such as energy, industry, agriculture, transport, and waste. It helps identify which sectors contribute most to GHS output.',
+                'color': '#f39c12'
+            },
+            'Nature Source': {
+                'icon': '⚗️',
+                'title': 'Greenhouse Gas Output by Nature Sources',
+                'description': 'This analysis categorizes Greenhouse Gas Output by the natural sources such as cropland, grassland, wetlands, and other ecosystems. It helps understand the role of nature in greenhouse gas absorption and GHS output.',
+                'color': '#9b59b6'
+            }
+        }
+        # Datasets added through the catalog (e.g. synthetic ones) get a generic description
+        current_info = subtopic_info.get(st.session_state.subtopic, {
+            'icon': '🧪',
+            'title': f'Greenhouse Gas Output ({st.session_state.subtopic})',
+            'description': 'This dataset was added through the data catalog and has no curated description.',
+            'color': '#95a5a6'
+        })
+        st.markdown(f"""
+        <div style="
+            background-color: #0e1117;
+            padding: 20px;
+            border-radius: 10px;
+            border-left: 5px solid {current_info['color']};
+            margin: 20px 0;
+            border: 1px solid #262730;
+        ">
+            <div style="display: flex; align-items: center; margin-bottom: 15px;">
+                <span style="font-size: 24px; margin-right: 15px;">{current_info['icon']}</span>
+                <span style="font-weight: bold; font-size: 20px; color: #fafafa;">{current_info['title']}</span>
+            </div>
+            <div style="color: #a3a8b8; font-size: 16px; line-height: 1.5;">
+                {current_info['description']}
+            </div>
+        </div>
+        """, unsafe_allow_html=True)
+    with col2:
+        st.markdown(
+            """
+            <div style="text-align: center;">
+            <h4>🌐 Overview of Subtopic</h4>
+            </div>
+            """,
+            unsafe_allow_html=True
+        )
+    with span('data load'):
+        dfs_all_subtopics = load_dataframe_for_subtopic(st.session_state.topic) # contain { 'Without LULUCF': df1, 'From LULUCF': df2, 'With LULUCF': df3, 'Sector': df4, 'Nature Source': df5 }
+        df_selected_subtopic = dfs_all_subtopics.get(st.session_state.subtopic)
+    with span('user_config'):
+        st.session_state.user_config = user_config(df_selected_subtopic)
+    with span('filter_data'):
+        # Adding or removing a country, measure or year only updates the session's previous result by that slice
+        df_filtered = incremental_filter(df_selected_subtopic, st.session_state.user_config)
+    with col2:
+        # Totals of every measure over the selected countries and years, aggregated once per selection
+        st.plotly_chart(cached_chart(sunburst)(hierarchy_totals(st.session_state.user_config)), use_container_width=True)
+    #section 2: display summary statistics 
+    summary_section(df_filtered, selection_totals())
+    #section 3: display static map and animated map
+    geographic_view(df_filtered)
+    analytical_view(df_filtered, df_selected_subtopic)
+    # section 4: Correlational analysis and environmental factor breakdown
+    correlation_section()
 
 # Nutrient Inputs and Outputs section
 elif st.session_state.topic == 'Nutrient Input and Output':
@@ -504,27 +621,8 @@ elif st.session_state.topic == 'Nutrient Input and Output':
     st.markdown("---")
 
     # Load nutrient datasets
-    nutrient_files = {
-        'fertilisers': 'Fertilisers.csv',
-        'livestock_manure': 'Livestock_manure_production.csv',
-        'other_nutrient_inputs': 'Other_nutrient_inputs.csv',
-        'forage': 'Forage.csv',
-        'harvested_crops': 'Harvested_crops.csv'
-    }
-
-    all_dfs = {}
-    for name, file in nutrient_files.items():
-        try:
-            df = pd.read_csv(BASE_DIR / 'Nutrient_inputs_and_outputs' / file)
-            df.columns = [col.strip().replace(' ', '_').upper() for col in df.columns]
-            if 'REF_AREA' in df.columns:
-                df = df[~df['REF_AREA'].isin(['EU27', 'EU', 'EU27_2020', 'EU28'])]
-            if 'UNIT_MULT' in df.columns:
-                df['OBS_VALUE'] = pd.to_numeric(df['OBS_VALUE'], errors='coerce')
-                df['OBS_VALUE'] *= 10 ** df['UNIT_MULT'].fillna(0)
-            all_dfs[name] = df
-        except Exception as e:
-            st.warning(f"Failed to load {name}: {e}")
+    with span('data load'):
+        all_dfs = load_nutrient_datasets()
 
     # Manual mapping from notebook
     country_name_map = {
@@ -544,14 +642,15 @@ elif st.session_state.topic == 'Nutrient Input and Output':
     }
 
     st.markdown("### 🧶 Summary Statistics")
-    combined = pd.concat(all_dfs.values())
-    combined['TIME_PERIOD'] = pd.to_numeric(combined['TIME_PERIOD'], errors='coerce')
+    # Overview straight from the cached frames, without concatenating them
+    years = [pd.to_numeric(df['TIME_PERIOD'], errors='coerce') for df in all_dfs.values()]
+    country_list = list(dict.fromkeys(country for df in all_dfs.values() for country in df['REF_AREA'].dropna().unique()))
     dataset_info = {
-        "records": len(combined),
-        "time_min": int(combined['TIME_PERIOD'].min()),
-        "time_max": int(combined['TIME_PERIOD'].max()),
-        "countries": combined['REF_AREA'].nunique(),
-        "country_list": combined['REF_AREA'].unique().tolist()
+        "records": sum(len(df) for df in all_dfs.values()),
+        "time_min": int(min(year.min() for year in years)),
+        "time_max": int(max(year.max() for year in years)),
+        "countries": len(country_list),
+        "country_list": country_list
     }
 
     col1, col2 = st.columns(2, gap="large")
@@ -567,8 +666,8 @@ elif st.session_state.topic == 'Nutrient Input and Output':
     st.markdown("---")
 
     # Year filter
-    year_min = int(combined['TIME_PERIOD'].min())
-    year_max = int(combined['TIME_PERIOD'].max())
+    year_min = dataset_info['time_min']
+    year_max = dataset_info['time_max']
     year_range = st.slider("Select Year Range", min_value=year_min, max_value=year_max, value=(year_min, year_max), step=1)
     full_years = pd.Index(range(year_range[0], year_range[1] + 1))
 
@@ -674,4 +773,8 @@ elif st.session_state.topic == 'Nutrient Input and Output':
 
     st.markdown("---")
     st.markdown("### 📊 Analytical View")
-    st.dataframe(combined.head(100))
+    nutrient_data_view(all_dfs)
+
+finish_rerun(rerun_trace)
+if diagnostics_enabled():
+    render_diagnostics_panel(rerun_trace)
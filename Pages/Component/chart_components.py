@@ -3,15 +3,40 @@ Chart Components Module
 Contains all chart visualization functions for the OECD Dashboard
 """
 
+import functools
 import pandas as pd
 import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 from pathlib import Path
 import streamlit as st
+from Component.data_loader import load_population_median
+from Component.instrumentation import timed
+from Component.manifest import frame_key
+from Component.resolution import PIXELS_PER_LINE_POINT, point_budget, downsample_wide
+from Component.snapshots import load_snapshot
 
 # Base directory for data files
 BASE_DIR = Path(__file__).parent.parent.parent / 'DataSource'
+# numpy 2 renamed trapz to trapezoid
+_trapezoid = getattr(np, 'trapezoid', None) or np.trapz
+# Figures kept per chart builder by cached_chart
+CHART_CACHE_ENTRIES = 32
+
+_cached_builders = {}
+
+def cached_chart(builder):
+    """Return a variant of a chart builder that builds each figure once per input data and options"""
+    if builder not in _cached_builders:
+        @functools.wraps(builder)
+        def snapshot_or_build(*args):
+            # A pre-rendered snapshot (Tools/build_snapshots.py) of the same inputs skips the build entirely
+            figure = load_snapshot(builder.__name__, args)
+            return figure if figure is not None else builder(*args)
+        # Frames are keyed by their (dataset version, selection) tag instead of hashing their content on every call
+        _cached_builders[builder] = st.cache_data(max_entries=CHART_CACHE_ENTRIES, show_spinner=False,
+                                                  hash_funcs={pd.DataFrame: frame_key})(snapshot_or_build)
+    return _cached_builders[builder]
 
 def get_color_mapping(df: pd.DataFrame, column_name: str = 'MEASURE') -> dict:
     """Create consistent color mapping for specified column"""
@@ -35,56 +60,45 @@ def get_color_mapping(df: pd.DataFrame, column_name: str = 'MEASURE') -> dict:
     
     return color_map
 
-def sunburst():
-    """Create sunburst chart with hard-coded data for GHS categories"""
-    data = {
-        'level1': [
-            # Without LULUCF (6 items)
-            'GHS', 'GHS', 'GHS', 'GHS', 'GHS', 'GHS',
-            # From LULUCF (3 items)
-            'GHS', 'GHS', 'GHS',
-            # With LULUCF (6 items)
-            'GHS', 'GHS', 'GHS', 'GHS', 'GHS', 'GHS',
-            # By Sector (8 items)
-            'GHS', 'GHS', 'GHS', 'GHS', 'GHS', 'GHS', 'GHS', 'GHS',
-            # By Nature Source (22 items)
-            'GHS', 'GHS', 'GHS', 'GHS', 'GHS', 'GHS', 'GHS', 'GHS', 'GHS', 'GHS', 'GHS', 'GHS', 'GHS', 'GHS', 'GHS', 'GHS', 'GHS', 'GHS', 'GHS', 'GHS', 'GHS', 'GHS'
-        ],
-        'level2': [
-            # Without LULUCF (6 items)
-            'Without LULUCF', 'Without LULUCF', 'Without LULUCF', 'Without LULUCF', 'Without LULUCF', 'Without LULUCF',
-            # From LULUCF (3 items)
-            'From LULUCF', 'From LULUCF', 'From LULUCF',
-            # With LULUCF (6 items)
-            'With LULUCF', 'With LULUCF', 'With LULUCF', 'With LULUCF', 'With LULUCF', 'With LULUCF',
-            # Sector (8 items)
-            'Sector', 'Sector', 'Sector', 'Sector', 'Sector', 'Sector', 'Sector', 'Sector',
-            # Nature Source (22 items)
-            'Nature Source', 'Nature Source', 'Nature Source', 'Nature Source', 'Nature Source', 'Nature Source', 'Nature Source', 'Nature Source', 'Nature Source', 'Nature Source', 'Nature Source', 'Nature Source', 'Nature Source', 'Nature Source', 'Nature Source', 'Nature Source', 'Nature Source', 'Nature Source', 'Nature Source', 'Nature Source', 'Nature Source', 'Nature Source'
-            ],
-            'level3': [
-            # Without LULUCF (6 items)
-            'CH4', 'CO2', 'HFC', 'N2O', 'PFC', 'SF',
-            # From LULUCF (3 items)
-            'CH4_LULUCF', 'CO2_LULUCF', 'N2O_LULUCF',
-            # With LULUCF (6 items)
-            'CH4', 'CO2', 'HFC', 'N2O', 'PFC', 'SF',
-            # By Sector (8 items)
-            'TR', 'IPP', 'EI', 'AGR', 'OTH_SECTOR', 'MIC', 'WASTE', 'OTH',
-            # By Nature Source (22 items)
-            'SETT_CO2', 'CL_CH4', 'CL_CO2', 'OT_N2O', 'GL_N2O', 'GL_CO2', 'GL_CH4', 'F_N2O', 'WET_N2O', 'HWP_CO2', 'F_CH4', 'F_CO2', 'SETT_N2O', 'SETT_CH4', 'CL_N2O', 'WET_CH4', 'OTHER_CO2', 'OTHER_N2O', 'OT_CO2', 'OTHER_CH4', 'OT_CH4', 'WET_CO2'
-        ]
-    }
-    # Create DataFrame and sunburst chart
-    df = pd.DataFrame(data)
+def pivot_sum(df: pd.DataFrame, index: str, columns: str) -> pd.DataFrame:
+    """OBS_VALUE summed per index value (rows) and columns value, as the bar and line charts plot it"""
+    return df.pivot_table(index=index, columns=columns, values='OBS_VALUE', aggfunc='sum').reset_index()
+
+def group_sum(df: pd.DataFrame, groupby_var: str) -> pd.DataFrame:
+    """OBS_VALUE summed per value of one column, as the pie chart and tree map plot it"""
+    return df.groupby(groupby_var)[['OBS_VALUE']].sum().reset_index()
+
+@timed
+def sunburst(df_nodes: pd.DataFrame) -> go.Figure:
+    """Create sunburst chart of the measure hierarchy sized by each measure's share of its subtopic's emissions"""
+    # Subtopics report in different units, so each gets an equal ring slice and the wedges within it show shares
+    hover = np.where(
+        df_nodes['depth'] == 0, df_nodes['label'],
+        df_nodes['label'] + '<br>Total: ' + df_nodes['value'].map('{:,.0f}'.format)
+        + '<br>Share of subtopic: ' + (100 * df_nodes['share']).map('{:.1f}%'.format),
+    )
+    fig = go.Figure(go.Sunburst(
+        ids=df_nodes['id'],
+        labels=df_nodes['label'],
+        parents=df_nodes['parent'],
+        values=df_nodes['size'],
+        branchvalues='remainder',
+        hovertext=hover,
+        hoverinfo='text',
+    ))
     # Dark theme
-    fig = px.sunburst(df, path=['level1', 'level2', 'level3'], template='plotly_dark')
-    # Increase the radius of the sunburst chart
-    fig.update_layout(margin=dict(t=0, l=0, r=0, b=0), font=dict(size=20))
+    fig.update_layout(template='plotly_dark', margin=dict(t=0, l=0, r=0, b=0), font=dict(size=20))
     return fig
 
-def static_map(df: pd.DataFrame, projection_type: str = 'mercator') -> go.Figure:
-    """Create static choropleth map showing GHS output by country"""
+def set_projection(fig: go.Figure, projection_type: str) -> go.Figure:
+    """Apply a projection to a built map; only layout.geo changes, the traces and animation frames are reused"""
+    # cached_chart returns a fresh copy on every call, so the cached figure itself is never modified
+    fig.update_geos(projection_type=projection_type)
+    return fig
+
+@timed
+def static_map(df: pd.DataFrame) -> go.Figure:
+    """Create static choropleth map showing GHS output by country (projection applied with set_projection)"""
     df_sum = df.groupby('REF_AREA')['OBS_VALUE'].sum().reset_index()
     fig = px.choropleth(
         df_sum,
@@ -105,14 +119,14 @@ def static_map(df: pd.DataFrame, projection_type: str = 'mercator') -> go.Figure
             showcoastlines=True,
             oceancolor='LightBlue',
             landcolor='White',
-            projection_type=projection_type,
             showocean=True
         ), title_font=dict(size=30), title_x=0.3
     )
     return fig
 
-def animated_map(df: pd.DataFrame, projection_type: str = 'mercator'):
-    """Create animated choropleth map showing GHS evolution over time"""
+@timed
+def animated_map(df: pd.DataFrame):
+    """Create animated choropleth map showing GHS evolution over time (projection applied with set_projection)"""
     df_map_animated = df.groupby(['REF_AREA', 'TIME_PERIOD'])['OBS_VALUE'].sum().reset_index()
     # Create animated choropleth map
     fig_animated = px.choropleth(df_map_animated,
@@ -136,24 +150,27 @@ def animated_map(df: pd.DataFrame, projection_type: str = 'mercator'):
             showcoastlines=True,
             oceancolor='LightBlue',
             landcolor='White',
-            projection_type=projection_type,
             showocean=True
         ),title_font=dict(size=30), title_x=0.3
     )
     return fig_animated
 
-def multi_line(df: pd.DataFrame, x_axis_variable: str, variable_for_category: str, category_name: str, chart_type: str = "line") -> go.Figure:
-    """Create multi-line or area chart showing trends over time"""
-    df_pivoted = df.pivot_table(index='TIME_PERIOD', columns=variable_for_category, values='OBS_VALUE', aggfunc='sum').reset_index()
+@timed
+def multi_line(df: pd.DataFrame, x_axis_variable: str, variable_for_category: str, category_name: str, chart_type: str = "line",
+               df_pivoted: pd.DataFrame | None = None) -> go.Figure:
+    """Create multi-line or area chart showing trends over time (df_pivoted: pivot_sum by TIME_PERIOD, if already computed)"""
+    df_pivoted = pivot_sum(df, 'TIME_PERIOD', variable_for_category) if df_pivoted is None else df_pivoted.copy()
     # Add 'total' column for total greenhouse gas output using only available measures
     df_pivoted['total'] = df_pivoted.iloc[:, 1:].sum(axis=1)
     # sort column order of df_pivoted by alphabetical order of measures
     df_pivoted = df_pivoted[['TIME_PERIOD'] + sorted(df_pivoted.columns[1:-1].tolist()) + ['total']]
     # Get consistent color mapping
     color_map = get_color_mapping(df, 'MEASURE')
+    # Long series are thinned to what 700 px can show; areas and annotations below still use every year
+    df_plot, downsample_note = downsample_wide(df_pivoted, 'TIME_PERIOD', 'total', point_budget(700, PIXELS_PER_LINE_POINT))
     
     if chart_type == "area":
-        fig_line = px.area(df_pivoted, x='TIME_PERIOD', y=df_pivoted.columns[1:-1],  # Exclude 'total' column
+        fig_line = px.area(df_plot, x='TIME_PERIOD', y=df_plot.columns[1:-1],  # Exclude 'total' column
                           title=f"Accumulative GHS output for each {category_name} of each {x_axis_variable} per Year",
                           labels={'TIME_PERIOD': 'Year', 'value': 'Gas Output (Tonnes of CO2-equivalent)', 'variable': category_name},
                           template='plotly_dark', width=700, height=600,
@@ -193,7 +210,7 @@ def multi_line(df: pd.DataFrame, x_axis_variable: str, variable_for_category: st
             
             # Calculate area using trapezoidal integration
             if len(y_values) > 1:
-                area = np.trapz(y_values, x_values)
+                area = _trapezoid(y_values, x_values)
                 areas[measure] = abs(area)  # Use absolute value for area calculation
                 total_area += abs(area)
             else:
@@ -235,15 +252,18 @@ def multi_line(df: pd.DataFrame, x_axis_variable: str, variable_for_category: st
                 )
     else:
         # Create a normal line chart using Plotly Express with explicit color mapping
-        fig_line = px.line(df_pivoted, x='TIME_PERIOD', y=df_pivoted.columns[1:-1],  # Exclude 'total' column
+        fig_line = px.line(df_plot, x='TIME_PERIOD', y=df_plot.columns[1:-1],  # Exclude 'total' column
                           title=f"GHS output for each {category_name} per Year",
                           labels={'TIME_PERIOD': 'Year', 'value': 'Gas Output (Tonnes of CO2-equivalent)', 'variable': category_name},
                           template='plotly_dark', width=700, height=600,
                           color_discrete_map=color_map)
         fig_line.update_traces(mode='lines+markers', marker=dict(size=7), line=dict(width=3))
         fig_line.update_layout(title_font=dict(size=20), title_x=0.2)
+    if downsample_note:
+        fig_line.update_layout(title_text=f"{fig_line.layout.title.text}<br><sup>{downsample_note}</sup>")
     return fig_line
 
+@timed
 def animated_hor_bar(df: pd.DataFrame, col_to_rank: str) -> go.Figure:
     """Create animated horizontal bar chart showing evolution over time"""
     groupby_var = [col_to_rank, 'TIME_PERIOD']
@@ -405,11 +425,12 @@ def animated_hor_bar(df: pd.DataFrame, col_to_rank: str) -> go.Figure:
             
     return fig
 
-def pie(df: pd.DataFrame, groupby_var: str, category_name: str, value_filter: str = "All Values") -> go.Figure:
-    """Create pie chart showing proportions"""
-    columns_to_count = ['OBS_VALUE']
+@timed
+def pie(df: pd.DataFrame, groupby_var: str, category_name: str, value_filter: str = "All Values",
+        df_grouped: pd.DataFrame | None = None) -> go.Figure:
+    """Create pie chart showing proportions (df_grouped: group_sum by groupby_var, if already computed)"""
     # Group the DataFrame by the specified variable and sum the OBS_VALUE
-    df_grouped = df.groupby(groupby_var)[columns_to_count].sum().reset_index()
+    df_grouped = group_sum(df, groupby_var) if df_grouped is None else df_grouped.copy()
     # Apply value filtering for positive/negative values
     if value_filter == "Show all contributors to GHS Emissions":
         df_grouped = df_grouped[df_grouped['OBS_VALUE'] >= 0]
@@ -453,11 +474,12 @@ def pie(df: pd.DataFrame, groupby_var: str, category_name: str, value_filter: st
     fig.update_layout(showlegend=True, font=dict(size=25), title_font=dict(size=25), title_x=0.3)
     return fig
 
-def tree_map(df: pd.DataFrame, groupby_var: str, category_name: str, value_filter: str = "All Values") -> go.Figure:
-    """Create tree map visualization"""
-    columns_to_count = ['OBS_VALUE']
+@timed
+def tree_map(df: pd.DataFrame, groupby_var: str, category_name: str, value_filter: str = "All Values",
+             df_grouped: pd.DataFrame | None = None) -> go.Figure:
+    """Create tree map visualization (df_grouped: group_sum by groupby_var, if already computed)"""
     # Group the DataFrame by the specified variable and sum the OBS_VALUE
-    df_grouped = df.groupby(groupby_var)[columns_to_count].sum().reset_index()
+    df_grouped = group_sum(df, groupby_var) if df_grouped is None else df_grouped.copy()
     
     # Apply value filtering for positive/negative values
     if value_filter == "Show all contributors to GHS Emissions":
@@ -479,7 +501,7 @@ def tree_map(df: pd.DataFrame, groupby_var: str, category_name: str, value_filte
             text=f"No {value_filter.lower()} found in the selected data",
             xref="paper", yref="paper",
             x=0.5, y=0.5, xanchor='center', yanchor='middle',
-            showarrow=False, font=dict(size=16), color='white')
+            showarrow=False, font=dict(size=16, color='white'))
         fig.update_layout(
             template='plotly_dark',
             title=f"Proportion of {category_name}",
@@ -527,14 +549,16 @@ def tree_map(df: pd.DataFrame, groupby_var: str, category_name: str, value_filte
     )
     return fig
 
-def static_bubble(df_ghs: pd.DataFrame, df_x: pd.DataFrame, x_axis_label: str) -> go.Figure:
-    """Create static bubble chart showing relationship between variables"""
-    df_pop = pd.read_csv(BASE_DIR / 'Population' / 'AnnualPopulationOECDCountry.csv')
-    df_pop.rename(columns={"OBS_VALUE": "POPULATION"}, inplace=True)
-    df_ghs = df_ghs.groupby(['REF_AREA'])['OBS_VALUE'].sum().reset_index()
-    df_x = pd.merge(df_x, df_pop, on=["REF_AREA"], how='inner')
-    df_x = df_x.groupby(['REF_AREA', 'POPULATION'])['OBS_VALUE'].sum().reset_index()
-    df_for_static_scatter_plot = pd.merge(df_x, df_ghs, on=["REF_AREA"], how='inner')
+def bubble_totals(df_view: pd.DataFrame, factor: str) -> pd.DataFrame:
+    """GHS output (OBS_VALUE_y) and environmental factor (OBS_VALUE_x) of the panel country-years that have both"""
+    df_totals = df_view[df_view[factor].notna()]
+    return df_totals.rename(columns={factor: 'OBS_VALUE_x', 'GHS': 'OBS_VALUE_y'})
+
+@timed
+def static_bubble(df_view: pd.DataFrame, x_axis_label: str) -> go.Figure:
+    """Create static bubble chart showing relationship between variables (from a panel selection view)"""
+    df_totals = bubble_totals(df_view, x_axis_label).groupby('REF_AREA')[['OBS_VALUE_x', 'OBS_VALUE_y']].sum()
+    df_for_static_scatter_plot = df_totals.join(load_population_median(), how='inner').reset_index()
     fig = px.scatter(
         df_for_static_scatter_plot, 
         x='OBS_VALUE_x', 
@@ -556,21 +580,19 @@ def static_bubble(df_ghs: pd.DataFrame, df_x: pd.DataFrame, x_axis_label: str) -
     # Set a minimum marker size for visibility
     fig.update_traces(marker=dict(sizemin=1))
     fig.add_annotation(
-    text="output of 3 variables of each country is accumulated over time except for the population being the median",
+    text="output of 3 variables of each country is accumulated over time except for the population being the median (over all years)",
     xref="paper", yref="paper",
     x=0.5, y=0,  # Position below the plot
     showarrow=False, font=dict(size=15, color="red"))
     fig.update_layout(title_font=dict(size=25), title_x=0.08, font=dict(size=20))
     return fig
 
-def animated_bubble(df_ghs: pd.DataFrame, df_x: pd.DataFrame, x_axis_label: str) -> go.Figure:
-    """Create animated bubble chart showing evolution over time"""
-    df_pop = pd.read_csv(BASE_DIR / 'Population' / 'AnnualPopulationOECDCountry.csv')
-    df_pop.rename(columns={"OBS_VALUE": "POPULATION"}, inplace=True)
-    df_ghs = df_ghs.groupby(['REF_AREA', 'TIME_PERIOD'])['OBS_VALUE'].sum().reset_index()
-    df_x = pd.merge(df_x, df_pop, on=["REF_AREA", "TIME_PERIOD"], how='inner')
-    df_x = df_x.groupby(['REF_AREA', 'TIME_PERIOD', 'POPULATION'])['OBS_VALUE'].sum().reset_index()
-    df_for_animated_scatter_plot = pd.merge(df_x, df_ghs, on=["REF_AREA", "TIME_PERIOD"], how='inner')
+@timed
+def animated_bubble(df_view: pd.DataFrame, x_axis_label: str) -> go.Figure:
+    """Create animated bubble chart showing evolution over time (from a panel selection view with POPULATION)"""
+    df_for_animated_scatter_plot = bubble_totals(df_view, x_axis_label).dropna(subset=['POPULATION'])
+    # Frames follow the first appearance of each year
+    df_for_animated_scatter_plot = df_for_animated_scatter_plot.sort_values(['TIME_PERIOD', 'REF_AREA'])
     fig = px.scatter(
         df_for_animated_scatter_plot, 
         x='OBS_VALUE_x', 
@@ -594,9 +616,11 @@ def animated_bubble(df_ghs: pd.DataFrame, df_x: pd.DataFrame, x_axis_label: str)
     fig.update_traces(marker=dict(sizemin=1))
     return fig
 
-def bar_line(df: pd.DataFrame, x_axis_variable: str, category_to_stack: str, category_name: str) -> go.Figure:
-    """Create combined bar and line chart"""
-    df_pivoted = df.pivot_table(index=x_axis_variable, columns=category_to_stack, values='OBS_VALUE', aggfunc='sum').reset_index()
+@timed
+def bar_line(df: pd.DataFrame, x_axis_variable: str, category_to_stack: str, category_name: str,
+             df_pivoted: pd.DataFrame | None = None) -> go.Figure:
+    """Create combined bar and line chart (df_pivoted: pivot_sum by x_axis_variable, if already computed)"""
+    df_pivoted = pivot_sum(df, x_axis_variable, category_to_stack) if df_pivoted is None else df_pivoted.copy()
     # Add 'total' column for total greenhouse gas output using only available measures
     df_pivoted['total'] = df_pivoted.iloc[:, 1:].sum(axis=1)
     #sort descending by total only if x_axis_variable is not 'TIME_PERIOD'
@@ -730,10 +754,12 @@ def bar_line(df: pd.DataFrame, x_axis_variable: str, category_to_stack: str, cat
     ))
     return fig_stacked
 
-def percentage_bar_line(df: pd.DataFrame, x_axis_variable: str, category_to_stack: str, category_name: str) -> go.Figure:
-    """Create percentage-based bar and line chart"""
+@timed
+def percentage_bar_line(df: pd.DataFrame, x_axis_variable: str, category_to_stack: str, category_name: str,
+                        df_pivoted: pd.DataFrame | None = None) -> go.Figure:
+    """Create percentage-based bar and line chart (df_pivoted: pivot_sum by x_axis_variable, if already computed)"""
     # Create the pivot table for percentage calculations
-    df_pivoted_for_percentage = df.pivot_table(index=x_axis_variable, columns=category_to_stack, values='OBS_VALUE', aggfunc='sum').reset_index()
+    df_pivoted_for_percentage = pivot_sum(df, x_axis_variable, category_to_stack) if df_pivoted is None else df_pivoted.copy()
 
     # Calculate percentages 
     df_percentage = df_pivoted_for_percentage.copy()
@@ -830,6 +856,7 @@ def percentage_bar_line(df: pd.DataFrame, x_axis_variable: str, category_to_stac
     fig_detailed.update_yaxes(ticks="", showticklabels=False)
     return fig_detailed
 
+@timed
 def water_fall(df: pd.DataFrame, x_axis_variable: str, category_to_stack: str, category_name: str) -> go.Figure:
     """Create waterfall chart with enhanced customization"""
     df_pivoted = df.pivot_table(index=x_axis_variable, columns=category_to_stack, values='OBS_VALUE', aggfunc='sum').reset_index()
@@ -1014,3 +1041,82 @@ def water_fall(df: pd.DataFrame, x_axis_variable: str, category_to_stack: str, c
     fig_simple.update_yaxes(range=[0, max_y_value])
     #hide x-axis labels
     return fig_simple
+
+@timed
+def correlation_heatmap(df_coefficients: pd.DataFrame, method: str, breakdown: str) -> go.Figure:
+    """Create heatmap of the correlation between GHS output and each environmental factor per group"""
+    df_r = df_coefficients.pivot(index='group', columns='factor', values='r')
+    df_n = df_coefficients.pivot(index='group', columns='factor', values='n').reindex_like(df_r)
+    # Factor names without their unit keep the columns narrow
+    factor_labels = [factor.split(' (')[0] for factor in df_r.columns]
+    fig = go.Figure(go.Heatmap(
+        z=df_r.to_numpy(),
+        x=factor_labels,
+        y=df_r.index.tolist(),
+        customdata=df_n.to_numpy(),
+        zmin=-1, zmax=1,
+        colorscale='RdBu',
+        text=df_r.round(2).astype(str).replace('nan', '').to_numpy(),
+        texttemplate='%{text}',
+        hovertemplate='<b>%{y}</b><br>%{x}<br>r = %{z:.3f}<br>pairs: %{customdata}<extra></extra>',
+        colorbar=dict(title=method),
+    ))
+    fig.update_layout(
+        title=f"{method} correlation of GHS output with environmental factors ({breakdown.lower()})",
+        template='plotly_dark',
+        width=1000,
+        height=max(350, 22 * len(df_r) + 150),
+        yaxis=dict(autorange='reversed', dtick=1),
+        title_font=dict(size=20), title_x=0.05
+    )
+    return fig
+
+# ============================================================================
+# IN-CHART VIEW SWITCHING
+# ============================================================================
+# Layout that differs between the two views of a pair; each button restores its own view's settings
+SWITCHED_LAYOUT = ('title', 'annotations', 'shapes', 'xaxis', 'yaxis', 'barmode', 'showlegend', 'font')
+
+def paired_figure(views: list[go.Figure], labels: list[str]) -> go.Figure:
+    """One figure holding the traces of every view, with buttons that switch views in the browser (no rerun)"""
+    fig = go.Figure(layout=views[0].layout)
+    owners = []
+    for i, view in enumerate(views):
+        for trace in view.data:
+            fig.add_trace(trace)
+            owners.append(i)
+    for trace, owner in zip(fig.data, owners):
+        trace.visible = owner == 0
+    buttons = []
+    for i, (view, label) in enumerate(zip(views, labels)):
+        layout = view.layout.to_plotly_json()
+        # Settings a view does not have are sent as None, which removes the other view's (e.g. its annotations)
+        buttons.append(dict(label=label, method='update',
+                            args=[{'visible': [owner == i for owner in owners]}, {key: layout.get(key) for key in SWITCHED_LAYOUT}]))
+    fig.update_layout(updatemenus=[dict(type='buttons', direction='right', buttons=buttons, active=0, showactive=True,
+                                        x=0, xanchor='left', y=1.15, yanchor='bottom', font=dict(size=12))])
+    return fig
+
+@timed
+def bar_line_views(df: pd.DataFrame, x_axis_variable: str, category_to_stack: str, category_name: str) -> go.Figure:
+    """Value and percentage bar charts built from one pivot, switched with in-chart buttons"""
+    df_pivoted = pivot_sum(df, x_axis_variable, category_to_stack)
+    return paired_figure([bar_line(df, x_axis_variable, category_to_stack, category_name, df_pivoted),
+                          percentage_bar_line(df, x_axis_variable, category_to_stack, category_name, df_pivoted)],
+                         ["📈 Value", "🔢 Percentage"])
+
+@timed
+def share_views(df: pd.DataFrame, groupby_var: str, category_name: str, value_filter: str = "All Values") -> go.Figure:
+    """Pie chart and tree map built from one grouping, switched with in-chart buttons"""
+    df_grouped = group_sum(df, groupby_var)
+    return paired_figure([pie(df, groupby_var, category_name, value_filter, df_grouped),
+                          tree_map(df, groupby_var, category_name, value_filter, df_grouped)],
+                         ["🥧 Pie Chart", "🌳 Tree Map"])
+
+@timed
+def trend_views(df: pd.DataFrame, x_axis_variable: str, variable_for_category: str, category_name: str) -> go.Figure:
+    """Multi-line and area charts built from one pivot, switched with in-chart buttons"""
+    df_pivoted = pivot_sum(df, 'TIME_PERIOD', variable_for_category)
+    return paired_figure([multi_line(df, x_axis_variable, variable_for_category, category_name, "line", df_pivoted),
+                          multi_line(df, x_axis_variable, variable_for_category, category_name, "area", df_pivoted)],
+                         ["📊 Multi-Line", "🟦 Area"])
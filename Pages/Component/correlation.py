@@ -0,0 +1,102 @@
+"""
+Correlation Module
+Contains the correlation engine between GHS output and every environmental factor: Pearson and Spearman coefficients
+overall, per country and over rolling year windows, computed together for all factors
+"""
+
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from Component.data_loader import load_catalog
+from Component.panel import selection_view
+
+METHODS = ['Pearson', 'Spearman']
+# Years per rolling window (shorter selections use a single window over all selected years)
+ROLLING_WINDOW_YEARS = 10
+# Fewer pairs than this give no coefficient
+MIN_OBSERVATIONS = 3
+ALL_COUNTRIES = 'All countries'
+
+def _grouped_pearson(x: np.ndarray, y: np.ndarray, codes: np.ndarray, n_groups: int) -> tuple[np.ndarray, np.ndarray]:
+    """Pearson r and pair counts of y against every column of x, per group, from grouped sums (NaN pairs skipped)"""
+    n_factors = x.shape[1]
+    valid = ~np.isnan(x) & ~np.isnan(y)[:, None]
+    # One bincount per statistic covers every group and factor: bin = group * n_factors + factor
+    bins = (codes[:, None] * n_factors + np.arange(n_factors)).ravel()
+    size = n_groups * n_factors
+
+    def grouped_sum(values: np.ndarray) -> np.ndarray:
+        return np.bincount(bins, weights=np.where(valid, values, 0.0).ravel(), minlength=size).reshape(n_groups, n_factors)
+
+    n = grouped_sum(np.ones_like(x))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        # Centre on the group means first: the values are large (up to 1e11) and would cancel in the raw sums
+        x_centred = x - (grouped_sum(x) / n)[codes]
+        y_centred = y[:, None] - (grouped_sum(np.broadcast_to(y[:, None], x.shape)) / n)[codes]
+        covariance = grouped_sum(x_centred * y_centred)
+        r = covariance / np.sqrt(grouped_sum(x_centred ** 2) * grouped_sum(y_centred ** 2))
+    r[(n < MIN_OBSERVATIONS) | ~np.isfinite(r)] = np.nan
+    return np.clip(r, -1, 1), n
+
+def _grouped_ranks(x: np.ndarray, y: np.ndarray, codes: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Average ranks within each group, over the rows where both values of a factor's pair are present"""
+    valid = ~np.isnan(x) & ~np.isnan(y)[:, None]
+    groups = pd.Series(codes)
+    x_ranks = pd.DataFrame(np.where(valid, x, np.nan)).groupby(groups).rank().to_numpy()
+    y_ranks = pd.DataFrame(np.where(valid, y[:, None], np.nan)).groupby(groups).rank().to_numpy()
+    return x_ranks, y_ranks
+
+def grouped_correlations(panel: pd.DataFrame, factor_names: list[str], codes: np.ndarray, labels: list[str], scope: str) -> pd.DataFrame:
+    """Pearson and Spearman of GHS against every factor for each group label; long format"""
+    x = panel[factor_names].to_numpy(dtype=float)
+    y = panel['GHS'].to_numpy(dtype=float)
+    pearson, n = _grouped_pearson(x, y, codes, len(labels))
+    x_ranks, y_ranks = _grouped_ranks(x, y, codes)
+    # Ranks are already pair-filtered per factor, so each factor column is correlated with its own rank column
+    spearman = np.column_stack([
+        _grouped_pearson(x_ranks[:, [j]], y_ranks[:, j], codes, len(labels))[0][:, 0] for j in range(len(factor_names))
+    ]) if factor_names else np.empty((len(labels), 0))
+    frames = []
+    for method, values in (('Pearson', pearson), ('Spearman', spearman)):
+        frame = pd.DataFrame(values, index=labels, columns=factor_names).rename_axis('group').reset_index()
+        frame = frame.melt(id_vars='group', var_name='factor', value_name='r')
+        frame['n'] = n.ravel(order='F').astype(int)
+        frame['method'] = method
+        frames.append(frame)
+    result = pd.concat(frames, ignore_index=True)
+    result.insert(0, 'scope', scope)
+    return result
+
+def rolling_windows(years: np.ndarray, window: int) -> tuple[np.ndarray, np.ndarray, list[str]]:
+    """Rows repeated once per window that contains their year: (row index, window code, window labels)"""
+    first, last = int(years.min()), int(years.max())
+    window = min(window, last - first + 1)
+    ends = np.arange(first + window - 1, last + 1)
+    # A year belongs to the windows ending in [year, year + window - 1]
+    offsets = np.arange(window)
+    window_codes = (years[:, None] - first - window + 1 + offsets)
+    rows = np.repeat(np.arange(len(years)), window)
+    window_codes = window_codes.ravel()
+    inside = (window_codes >= 0) & (window_codes < len(ends))
+    return rows[inside], window_codes[inside], [f"{end - window + 1}–{end}" for end in ends]
+
+def correlation_table(panel: pd.DataFrame, factor_names: list[str], window: int = ROLLING_WINDOW_YEARS) -> pd.DataFrame:
+    """Coefficients overall, per country and per rolling window (pooled over the selected countries)"""
+    if panel.empty:
+        return pd.DataFrame(columns=['scope', 'group', 'factor', 'r', 'n', 'method'])
+    results = [grouped_correlations(panel, factor_names, np.zeros(len(panel), dtype=int), [ALL_COUNTRIES], 'overall')]
+    country_codes, countries = pd.factorize(panel['REF_AREA'], sort=True)
+    results.append(grouped_correlations(panel, factor_names, country_codes, list(countries), 'country'))
+    rows, window_codes, labels = rolling_windows(panel['TIME_PERIOD'].to_numpy(), window)
+    results.append(grouped_correlations(panel.iloc[rows], factor_names, window_codes, labels, 'rolling'))
+    return pd.concat(results, ignore_index=True)
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def correlation_report(version: str, subtopic: str, years: tuple, countries: tuple, measures: tuple) -> pd.DataFrame:
+    """Correlations of one filter configuration against all environmental factors (cached per data version and configuration)"""
+    factors = list(load_catalog()['Environmental Factors'])
+    panel = selection_view({'selected_TIME_PERIOD': list(years), 'selected_REF_AREA': list(countries),
+                            'selected_MEASURE': list(measures)}, subtopic, factors)
+    return correlation_table(panel, [name for name in factors if name in panel.columns])
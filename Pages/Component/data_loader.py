@@ -0,0 +1,224 @@
+"""
+Data Loader Module
+Contains the dataset loaders and filters used by the OECD Dashboard
+"""
+
+import json
+import weakref
+from types import MappingProxyType
+import pandas as pd
+import numpy as np
+from pathlib import Path
+import streamlit as st
+from Component.shared_store import store_enabled, store_path, write_frame, map_frame
+from Component.manifest import BASE_DIR, CATALOG_PATH, dataset_version, frame_tag, tag_frame
+
+# Versions of the data kept by every loader cache: the current one and the one sessions may still be rendering
+LOADER_VERSIONS = 2
+
+# Copy-on-Write lets filtered frames share buffers with the cached ones (always on from pandas 3.0)
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.set_option('mode.copy_on_write', True)
+
+def freeze_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Rebuild a frame on read-only buffers so one cached copy can be shared by every session"""
+    columns = {}
+    for column in df.columns:
+        array = df[column].array
+        if isinstance(array, pd.arrays.NumpyExtensionArray) or isinstance(array, np.ndarray):
+            values = np.array(array, copy=True)
+            values.flags.writeable = False
+            columns[column] = values
+        else:
+            # Arrow-backed columns (the default string dtype from pandas 3.0) are immutable already
+            columns[column] = array
+    return pd.DataFrame(columns, copy=False)
+
+def read_dataset(file_path: str | Path, prepare=None) -> pd.DataFrame:
+    """Read a catalog CSV (optionally cleaned by `prepare`) as a read-only frame, from the shared store when enabled"""
+    file_path = Path(file_path)
+    if not store_enabled():
+        df = pd.read_csv(file_path)
+        return freeze_frame(prepare(df) if prepare else df)
+    # The first worker process to need a dataset writes it to the store, every process then maps the same file
+    path = store_path(file_path, prepare.__name__ if prepare else '')
+    if not path.exists():
+        df = pd.read_csv(file_path)
+        write_frame(prepare(df) if prepare else df, path)
+    return map_frame(path)
+
+# Greenhouse gas datasets are stored in this order, so every year (and year range) is one contiguous block of rows
+TIME_SORT_ORDER = ['TIME_PERIOD', 'REF_AREA', 'MEASURE']
+# Frames loaded in that order, by id. Not an attrs flag: pandas copies attrs to re-ordered and concatenated frames
+_time_sorted_frames = weakref.WeakValueDictionary()
+
+def sort_by_time(df: pd.DataFrame) -> pd.DataFrame:
+    """Order a dataset by TIME_SORT_ORDER with fresh row labels (applied before the frame is frozen or stored)"""
+    return df.sort_values(TIME_SORT_ORDER, kind='stable', ignore_index=True)
+
+def mark_time_sorted(df: pd.DataFrame) -> pd.DataFrame:
+    """Register a frame as ordered by TIME_PERIOD; frames derived from it are not registered"""
+    _time_sorted_frames[id(df)] = df
+    return df
+
+def is_time_sorted(df: pd.DataFrame) -> bool:
+    """Whether this very frame was registered by mark_time_sorted"""
+    return _time_sorted_frames.get(id(df)) is df
+
+def contiguous_years(selected_years) -> tuple[int, int] | None:
+    """(first, last) of a year selection given as a step-1 range, None for any other collection"""
+    if isinstance(selected_years, range) and selected_years.step == 1 and len(selected_years) > 0:
+        return selected_years[0], selected_years[-1]
+    return None
+
+def year_rows(df: pd.DataFrame, first: int, last: int) -> slice:
+    """Rows of a time-sorted frame whose TIME_PERIOD lies in [first, last], found by binary search"""
+    years = df['TIME_PERIOD'].to_numpy()
+    return slice(int(np.searchsorted(years, first, side='left')), int(np.searchsorted(years, last, side='right')))
+
+def load_catalog(catalog_path: str = str(CATALOG_PATH)) -> dict[str, dict[str, str]]:
+    """Load the dataset catalog of the current data version"""
+    return _read_catalog(catalog_path, dataset_version())
+
+@st.cache_data(max_entries=LOADER_VERSIONS)
+def _read_catalog(catalog_path: str, version: str) -> dict[str, dict[str, str]]:
+    """Read the dataset catalog, resolving relative file paths against the catalog's folder"""
+    catalog_dir = Path(catalog_path).parent
+    with open(catalog_path, encoding='utf-8') as f:
+        raw_catalog = json.load(f)
+    return {
+        topic: {name: str(catalog_dir / file_path) for name, file_path in entries.items()}
+        for topic, entries in raw_catalog.items()
+    }
+
+def catalog_path(topic: str, name: str) -> Path | None:
+    """Return the file path of one catalog dataset, or None when it is not listed"""
+    file_path = load_catalog().get(topic, {}).get(name)
+    return Path(file_path) if file_path else None
+
+def load_dataframe_for_subtopic(topic: str = 'Greenhouse Gas') -> MappingProxyType:
+    """Load all greenhouse gas datasets of the current data version (shared, read-only frames)"""
+    return _load_subtopics(topic, dataset_version())
+
+@st.cache_resource(show_spinner=False, max_entries=LOADER_VERSIONS)
+def _load_subtopics(topic: str, version: str) -> MappingProxyType:
+    """Load all greenhouse gas datasets with error handling (shared, read-only frames)"""
+    datasets: dict[str, pd.DataFrame] = {}
+    files_dict = load_catalog().get(topic)
+
+    if topic == 'Greenhouse Gas' and files_dict:
+        for subtopic, file_path in files_dict.items():
+            try:
+                df = mark_time_sorted(read_dataset(file_path, prepare=sort_by_time))
+                datasets[subtopic] = tag_frame(df, version, topic, subtopic)
+            except Exception as e:
+                st.error(f"Error loading {subtopic}: {e}")
+    else:
+        st.error(f"Data for '{topic}' is not yet implemented.")
+    return MappingProxyType(datasets)
+
+def load_dataframe_for_interested_correlational_env_indicator(indicator: str) -> pd.DataFrame:
+    """Load an environmental indicator dataset of the current data version (shared, read-only frame)"""
+    return _load_env_indicator(indicator, dataset_version())
+
+# One entry per environmental factor and kept version
+@st.cache_resource(show_spinner=False, max_entries=16 * LOADER_VERSIONS)
+def _load_env_indicator(indicator: str, version: str) -> pd.DataFrame:
+    """Load environmental indicator datasets for correlation analysis (shared, read-only frame)"""
+    file_path = catalog_path('Environmental Factors', indicator)
+    if file_path and file_path.exists():
+        try:
+            return tag_frame(read_dataset(file_path), version, 'Environmental Factors', indicator)
+        except Exception as e:
+            st.error(f"Error loading {indicator}: {e}")
+            return pd.DataFrame()
+    else:
+        st.error(f"Data for '{indicator}' is not available or file not found.")
+        return pd.DataFrame()
+
+def load_population() -> pd.DataFrame:
+    """Load the population table used to size the bubble charts (shared, read-only frame)"""
+    return _load_population(dataset_version())
+
+@st.cache_resource(show_spinner=False, max_entries=LOADER_VERSIONS)
+def _load_population(version: str) -> pd.DataFrame:
+    """Read the population table of one data version"""
+    return tag_frame(read_dataset(catalog_path('Population', 'Population')), version, 'Population', 'Population')
+
+def load_population_median() -> pd.Series:
+    """Median population of every country over all years, indexed by REF_AREA"""
+    return _population_median(dataset_version())
+
+@st.cache_resource(show_spinner=False, max_entries=LOADER_VERSIONS)
+def _population_median(version: str) -> pd.Series:
+    """Median population per country of one data version"""
+    return load_population().groupby('REF_AREA')['OBS_VALUE'].median().rename('POPULATION')
+
+# Aggregates that would double count their member countries in the nutrient charts
+NUTRIENT_EXCLUDED_AREAS = ['EU27', 'EU', 'EU27_2020', 'EU28']
+
+def clean_nutrient_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Normalise the column names, drop EU aggregates and apply the unit multipliers of a nutrient dataset"""
+    df.columns = [col.strip().replace(' ', '_').upper() for col in df.columns]
+    if 'REF_AREA' in df.columns:
+        df = df[~df['REF_AREA'].isin(NUTRIENT_EXCLUDED_AREAS)]
+    if 'UNIT_MULT' in df.columns:
+        df['OBS_VALUE'] = pd.to_numeric(df['OBS_VALUE'], errors='coerce')
+        df['OBS_VALUE'] *= 10 ** df['UNIT_MULT'].fillna(0)
+    return df
+
+def load_nutrient_datasets() -> MappingProxyType:
+    """Load every nutrient input/output dataset of the current data version (shared, read-only frames)"""
+    return _load_nutrient_datasets(dataset_version())
+
+@st.cache_resource(show_spinner=False, max_entries=LOADER_VERSIONS)
+def _load_nutrient_datasets(version: str) -> MappingProxyType:
+    """Load and clean every nutrient input/output dataset (shared, read-only frames)"""
+    datasets: dict[str, pd.DataFrame] = {}
+    for name, file_path in load_catalog().get('Nutrient Input and Output', {}).items():
+        try:
+            datasets[name] = tag_frame(read_dataset(file_path, prepare=clean_nutrient_frame), version, 'Nutrient Input and Output', name)
+        except Exception as e:
+            st.warning(f"Failed to load {name}: {e}")
+    return MappingProxyType(datasets)
+
+def selection_key(user_config: dict) -> tuple:
+    """Small, process-independent description of a selection for cache keys"""
+    selected_TIME_PERIOD = user_config.get("selected_TIME_PERIOD", [])
+    years = contiguous_years(selected_TIME_PERIOD)
+    return (('years', *years) if years else tuple(selected_TIME_PERIOD),
+            tuple(user_config.get("selected_REF_AREA", [])), tuple(user_config.get("selected_MEASURE", [])))
+
+def filtered_frame(df: pd.DataFrame, df_selected: pd.DataFrame, user_config: dict) -> pd.DataFrame:
+    """Tag a selection of a tagged dataset with the dataset's key and the selection (the dataset keeps its own key)"""
+    tag = frame_tag(df)
+    if df_selected is df or tag is None:
+        # Selections of untagged frames are hashed by content only if they reach a cache
+        return df_selected
+    return tag_frame(df_selected, tag, 'filter', selection_key(user_config))
+
+def filter_data(df: pd.DataFrame, user_config: dict[str, str]) -> pd.DataFrame:
+    """Filter the DataFrame to the selected years, countries and measures"""
+    user_config = {"selected_TIME_PERIOD": range(2012, 2021), "selected_REF_AREA": ["USA"], "selected_MEASURE": [], **user_config}
+    return filtered_frame(df, _filter_rows(df, user_config), user_config)
+
+def _filter_rows(df: pd.DataFrame, user_config: dict[str, str]) -> pd.DataFrame:
+    """Rows of the selected years, countries and measures"""
+    selected_TIME_PERIOD = user_config["selected_TIME_PERIOD"]
+    selected_REF_AREA = user_config["selected_REF_AREA"]
+    selected_MEASURE = user_config["selected_MEASURE"]
+    # A year range of a time-sorted dataset is one slice (a view), so only countries and measures need a mask
+    years = contiguous_years(selected_TIME_PERIOD)
+    df_years = df.iloc[year_rows(df, *years)] if years and is_time_sorted(df) else None
+    if df_years is not None:
+        mask = (df_years['REF_AREA'].isin(selected_REF_AREA)) & (df_years['MEASURE'].isin(selected_MEASURE))
+        if mask.all():
+            # Selecting everything ("Select All" and the full year range) shares the cached frame instead of copying it
+            return df if len(df_years) == len(df) else df_years
+        return df_years[mask]
+    # Filter the DataFrame for the selected TIME_PERIOD, REF_AREA, and MEASURE
+    mask = (df['TIME_PERIOD'].isin(selected_TIME_PERIOD)) & (df['REF_AREA'].isin(selected_REF_AREA)) & (df['MEASURE'].isin(selected_MEASURE))
+    # Selecting everything ("Select All" and the full year range) shares the cached frame instead of copying it
+    if mask.all():
+        return df
+    return df[mask]
@@ -0,0 +1,131 @@
+"""
+Data Table Module
+Contains the paginated data tables: rows are ordered and filtered on the server (with cached sort permutations of
+the full dataset) and only the visible page is read and sent to the browser
+"""
+
+from collections.abc import Mapping
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+# Columns shown in the table, in the order used to break ties when sorting by one of them
+TABLE_COLUMNS = ['TIME_PERIOD', 'REF_AREA', 'MEASURE', 'OBS_VALUE']
+PAGE_SIZES = [25, 50, 100, 500]
+
+def _sort_codes(series: pd.Series) -> np.ndarray:
+    """Numbers as they are, text as the rank of each value among the sorted unique values"""
+    if pd.api.types.is_numeric_dtype(series):
+        return series.to_numpy()
+    return pd.factorize(series, sort=True)[0]
+
+@st.cache_resource(show_spinner=False, max_entries=64)
+def sort_permutation(_df: pd.DataFrame, dataset_key, sort_by: str) -> np.ndarray:
+    """Row positions of a full dataset ordered by one column, computed once per dataset and column"""
+    keys = [sort_by] + [column for column in TABLE_COLUMNS if column != sort_by]
+    # np.lexsort sorts by the last key first
+    permutation = np.lexsort([_sort_codes(_df[column]) for column in reversed(keys)])
+    permutation.flags.writeable = False
+    return permutation
+
+def ordered_positions(df_full: pd.DataFrame, df_view: pd.DataFrame, dataset_key, sort_by: str, descending: bool) -> np.ndarray:
+    """Positions (in df_full) of the rows of a filtered view, in table order, without sorting the view"""
+    permutation = sort_permutation(df_full, dataset_key, sort_by)
+    if len(df_view) != len(df_full):
+        # The view keeps the row labels of the full dataset, so membership picks its rows out of the sorted order
+        member = np.zeros(len(df_full), dtype=bool)
+        member[df_full.index.get_indexer(df_view.index)] = True
+        permutation = permutation[member[permutation]]
+    return permutation[::-1] if descending else permutation
+
+def page_window(n_rows: int, key: str, size_column, page_column) -> tuple[int, int]:
+    """Rows-per-page and page widgets; returns the [start, stop) rows of the visible page"""
+    with size_column:
+        page_size = st.selectbox("Rows per page", PAGE_SIZES, index=1, key=f"{key}_page_size")
+    n_pages = max(1, -(-n_rows // page_size))
+    # A narrower filter or a bigger page can leave the remembered page past the end
+    if st.session_state.get(f"{key}_page", 1) > n_pages:
+        st.session_state[f"{key}_page"] = n_pages
+    with page_column:
+        page = st.number_input(f"Page (of {n_pages})", min_value=1, max_value=n_pages, value=1, step=1, key=f"{key}_page")
+    start = (page - 1) * page_size
+    return start, min(start + page_size, n_rows)
+
+def paged_table(df_full: pd.DataFrame, df_view: pd.DataFrame, dataset_key, key: str):
+    """Sortable table of a filtered view that renders one page at a time"""
+    col_sort, col_order, col_size, col_page = st.columns([3, 2, 2, 2])
+    with col_sort:
+        sort_by = st.selectbox("Sort by", TABLE_COLUMNS, key=f"{key}_sort_by")
+    with col_order:
+        descending = st.toggle("Descending", value=False, key=f"{key}_descending")
+    start, stop = page_window(len(df_view), key, col_size, col_page)
+
+    positions = ordered_positions(df_full, df_view, dataset_key, sort_by, descending)
+    page_rows = df_full.take(positions[start:stop])[TABLE_COLUMNS]
+    st.dataframe(page_rows.reset_index(drop=True), hide_index=True, use_container_width=True)
+    st.caption(f"Rows {min(start + 1, stop):,}–{stop:,} of {len(df_view):,}")
+
+# ============================================================================
+# MULTI-DATASET BROWSER
+# ============================================================================
+def _keep_valid(key: str, options: list):
+    """Drop remembered selections that are no longer among a multiselect's options"""
+    if key in st.session_state:
+        st.session_state[key] = [value for value in st.session_state[key] if value in options]
+
+def _unique_values(frames: Mapping[str, pd.DataFrame], column: str) -> list:
+    """Sorted union of a column's values across datasets"""
+    return sorted(set().union(*(frame[column].dropna().unique() for frame in frames.values() if column in frame)))
+
+def page_across(frames: Mapping[str, pd.DataFrame], positions: Mapping[str, np.ndarray], start: int, stop: int, label_column: str) -> pd.DataFrame:
+    """Rows [start, stop) of the datasets laid end to end, reading only the datasets the page touches"""
+    pieces, offset = [], 0
+    for name, rows in positions.items():
+        if offset + len(rows) > start and offset < stop:
+            selected = rows[max(start - offset, 0):stop - offset]
+            pieces.append(frames[name].take(selected).assign(**{label_column: name}))
+        offset += len(rows)
+        if offset >= stop:
+            break
+    if not pieces:
+        return pd.DataFrame(columns=[label_column])
+    page = pd.concat(pieces, ignore_index=True)
+    return page[[label_column] + [column for column in page.columns if column != label_column]]
+
+def browse_datasets(datasets: Mapping[str, pd.DataFrame], key: str, label_column: str = 'FILE'):
+    """Table over several datasets with file, country, year and measure filters, read one page at a time"""
+    names = list(datasets)
+    col_file, col_country, col_measure = st.columns(3)
+    with col_file:
+        files = st.multiselect("Files (all when empty)", names, key=f"{key}_files") or names
+    frames = {name: datasets[name] for name in files}
+    countries_all, measures_all = _unique_values(frames, 'REF_AREA'), _unique_values(frames, 'MEASURE')
+    _keep_valid(f"{key}_countries", countries_all)
+    _keep_valid(f"{key}_measures", measures_all)
+    with col_country:
+        countries = st.multiselect("Countries (all when empty)", countries_all, key=f"{key}_countries")
+    with col_measure:
+        measures = st.multiselect("Measures (all when empty)", measures_all, key=f"{key}_measures")
+    years_all = _unique_values(frames, 'TIME_PERIOD')
+    if any(year not in years_all for year in st.session_state.get(f"{key}_years", ())):
+        st.session_state.pop(f"{key}_years")
+    year_range = st.select_slider("Years", options=years_all, value=(years_all[0], years_all[-1]), key=f"{key}_years") if len(years_all) > 1 else None
+
+    # Row positions that pass the filters, per dataset; nothing is copied until the page is known
+    positions = {}
+    for name, frame in frames.items():
+        mask = np.ones(len(frame), dtype=bool)
+        if countries:
+            mask &= frame['REF_AREA'].isin(countries).to_numpy()
+        if measures:
+            mask &= frame['MEASURE'].isin(measures).to_numpy()
+        if year_range:
+            mask &= frame['TIME_PERIOD'].between(*year_range).to_numpy()
+        positions[name] = np.flatnonzero(mask)
+    n_rows = sum(len(rows) for rows in positions.values())
+
+    col_size, col_page = st.columns([1, 1])
+    start, stop = page_window(n_rows, key, col_size, col_page)
+    st.dataframe(page_across(frames, positions, start, stop, label_column), hide_index=True, use_container_width=True)
+    st.caption(f"Rows {min(start + 1, stop):,}–{stop:,} of {n_rows:,} across {len(frames)} files")
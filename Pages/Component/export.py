@@ -0,0 +1,68 @@
+"""
+Export Module
+Contains the chunked CSV and Parquet writers behind the dashboard's download buttons
+"""
+
+import tempfile
+from collections.abc import Iterable, Iterator, Mapping
+from typing import BinaryIO
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from Component.data_loader import filter_data
+
+# Rows converted per chunk: bounds the extra memory of an export regardless of the selection size
+EXPORT_CHUNK_ROWS = 50_000
+# Columns every greenhouse gas dataset has (some also carry UNIT_MEASURE / UNIT_MULT)
+EXPORT_COLUMNS = ['REF_AREA', 'MEASURE', 'TIME_PERIOD', 'OBS_VALUE']
+EXPORT_FORMATS = {
+    'CSV': ('csv', 'text/csv'),
+    'Parquet': ('parquet', 'application/vnd.apache.parquet'),
+}
+
+def subtopic_frames(datasets: Mapping[str, pd.DataFrame], user_config: dict) -> Iterator[tuple[str, pd.DataFrame]]:
+    """Every subtopic filtered to the selected years and countries (with all of its own measures)"""
+    for subtopic, df in datasets.items():
+        config = {**user_config, 'selected_MEASURE': df['MEASURE'].unique().tolist()}
+        yield subtopic, filter_data(df, config)
+
+def iter_chunks(frames: Iterable[tuple[str | None, pd.DataFrame]], chunk_rows: int = EXPORT_CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """Slice the export into chunks of the export columns, prefixed by SUBTOPIC when a name is given"""
+    for subtopic, df in frames:
+        # An empty selection still yields one (empty) chunk so the file gets its header or schema
+        for start in range(0, max(len(df), 1), chunk_rows):
+            chunk = df.iloc[start:start + chunk_rows][EXPORT_COLUMNS]
+            if subtopic is not None:
+                chunk = chunk.assign(SUBTOPIC=subtopic)[['SUBTOPIC'] + EXPORT_COLUMNS]
+            yield chunk
+
+def write_csv(chunks: Iterable[pd.DataFrame], sink: BinaryIO):
+    """Append the chunks as one CSV file (header from the first chunk)"""
+    header = True
+    for chunk in chunks:
+        sink.write(chunk.to_csv(index=False, header=header).encode('utf-8'))
+        header = False
+
+def write_parquet(chunks: Iterable[pd.DataFrame], sink: BinaryIO):
+    """Write every chunk as a row group of one Parquet file"""
+    writer = None
+    try:
+        for chunk in chunks:
+            table = pa.Table.from_pandas(chunk, schema=writer.schema if writer else None, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(sink, table.schema)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+
+def export_file(frames: Iterable[tuple[str | None, pd.DataFrame]], export_format: str) -> bytes:
+    """Write the export chunk by chunk to a temporary file and return its contents; the file is closed once read"""
+    writer = write_parquet if export_format == 'Parquet' else write_csv
+    with tempfile.TemporaryFile(buffering=1 << 20) as sink:
+        writer(iter_chunks(frames), sink)
+        # st.download_button keeps the bytes of the file, not the file, so reading it here costs no extra copy
+        sink.seek(0)
+        return sink.read()
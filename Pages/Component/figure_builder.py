@@ -0,0 +1,32 @@
+"""
+Figure Builder Module
+Builds the independent figures of a dashboard section concurrently on a thread pool
+"""
+
+import contextvars
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+from Component.instrumentation import span
+
+# Worker threads per section (the largest section has four figures); 0 or 1 builds them in the script thread
+FIGURE_WORKERS = int(os.environ.get('OECD_DASHBOARD_FIGURE_WORKERS', min(4, os.cpu_count() or 1)))
+
+def build_figures(jobs: dict[str, tuple]) -> dict:
+    """Build {name: (builder, *args)} concurrently and return {name: figure} in the order of the jobs"""
+    workers = min(FIGURE_WORKERS, len(jobs))
+    with span('build figures', workers=workers if workers > 1 else 0):
+        if workers <= 1:
+            return {name: builder(*args) for name, (builder, *args) in jobs.items()}
+        # The pool lives for this call only, so its threads carry this session's script context (for st.cache_data)
+        # and end with it; starting a few threads costs far less than one figure
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='figure-builder',
+                                initializer=add_script_run_ctx, initargs=(None, get_script_run_ctx())) as pool:
+            # Each job gets its own copy of the context so its span nests under 'build figures'
+            futures = {
+                name: pool.submit(contextvars.copy_context().run, builder, *args)
+                for name, (builder, *args) in jobs.items()
+            }
+            return {name: future.result() for name, future in futures.items()}
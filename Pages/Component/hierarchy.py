@@ -0,0 +1,99 @@
+"""
+Hierarchy Module
+Contains the measure hierarchy of the greenhouse gas datasets (subtopic, group, measure) derived from their measure
+codes, and the totals of its nodes aggregated from the country-year panel with a sparse node-by-measure matrix
+"""
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from Component.manifest import dataset_version, tag_frame
+from Component.panel import load_panel
+
+ROOT = 'GHS'
+# Land types of the nature-source codes (<land type>_<gas>)
+LAND_TYPES = {
+    'CL': 'Cropland', 'GL': 'Grassland', 'F': 'Forest', 'WET': 'Wetlands', 'SETT': 'Settlements',
+    'OT': 'Other land', 'HWP': 'Harvested wood products', 'OTHER': 'Other',
+}
+# Groups of sector and gas codes; codes without a group hang directly under their subtopic
+MEASURE_GROUPS = {
+    'EI': 'Energy', 'IPP': 'Energy', 'MIC': 'Energy', 'TR': 'Energy', 'OTH_SECTOR': 'Energy',
+    'AGR': 'Agriculture', 'WASTE': 'Waste', 'OTH': 'Other',
+    'HFC': 'F-gases', 'PFC': 'F-gases', 'SF': 'F-gases',
+}
+LULUCF_SUFFIX = '_LULUCF'
+
+def measure_group(measure: str) -> str | None:
+    """Group of a measure code: the land type of a nature source, the group of a sector or gas, or the gas of a
+    LULUCF code; None when the code has no group"""
+    if measure.endswith(LULUCF_SUFFIX):
+        return measure[:-len(LULUCF_SUFFIX)]
+    land_type, _, gas = measure.rpartition('_')
+    if land_type in LAND_TYPES and gas:
+        return LAND_TYPES[land_type]
+    return MEASURE_GROUPS.get(measure)
+
+def build_hierarchy(leaves: list[tuple[str, str]]) -> tuple[pd.DataFrame, np.ndarray, np.ndarray]:
+    """Nodes (id, parent, label) of the (subtopic, measure) leaves and the sparse node x leaf membership matrix
+    as (node, leaf) index pairs: every leaf belongs to itself and all its ancestors"""
+    group_sizes = pd.Series([(subtopic, measure_group(measure)) for subtopic, measure in leaves]).value_counts()
+    nodes = {ROOT: ('', ROOT)}
+    paths = []
+    for subtopic, measure in leaves:
+        path = [ROOT, f"{ROOT}/{subtopic}"]
+        nodes.setdefault(path[-1], (ROOT, subtopic))
+        group = measure_group(measure)
+        # A group with a single measure would only repeat it, so the measure hangs under the subtopic instead
+        if group is not None and group_sizes[(subtopic, group)] > 1:
+            path.append(f"{path[-1]}/{group}")
+            nodes.setdefault(path[-1], (path[-2], group))
+        path.append(f"{path[-1]}/{measure}")
+        nodes[path[-1]] = (path[-2], measure)
+        paths.append(path)
+    df_nodes = pd.DataFrame([(node_id, parent, label) for node_id, (parent, label) in nodes.items()], columns=['id', 'parent', 'label'])
+    position = {node_id: i for i, node_id in enumerate(df_nodes['id'])}
+    node_index = np.array([position[node_id] for path in paths for node_id in path])
+    leaf_index = np.repeat(np.arange(len(paths)), [len(path) for path in paths])
+    return df_nodes, node_index, leaf_index
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def measure_hierarchy(version: str) -> tuple[pd.DataFrame, list[str], np.ndarray, np.ndarray]:
+    """Hierarchy of every greenhouse gas measure in the panel of one data version, with the panel column of each leaf"""
+    columns = [column for column in load_panel(version).columns if column.startswith(f"{ROOT}|")]
+    df_nodes, node_index, leaf_index = build_hierarchy([tuple(column.split('|')[1:]) for column in columns])
+    return df_nodes, columns, node_index, leaf_index
+
+def aggregate(node_index: np.ndarray, leaf_index: np.ndarray, leaf_values: np.ndarray, n_nodes: int) -> np.ndarray:
+    """Sparse matrix-vector product: the sum of the leaf values under every node"""
+    return np.bincount(node_index, weights=leaf_values[leaf_index], minlength=n_nodes)
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _hierarchy_totals(version: str, years: tuple, countries: tuple) -> pd.DataFrame:
+    """Node totals of one data version and selection of years and countries"""
+    df_nodes, columns, node_index, leaf_index = measure_hierarchy(version)
+    panel = load_panel(version)
+    rows = panel['REF_AREA'].isin(countries) & panel['TIME_PERIOD'].isin(years)
+    leaf_totals = panel.loc[rows, columns].sum().to_numpy(dtype=float)
+    is_leaf = ~df_nodes['id'].isin(df_nodes['parent'])
+    subtopic = df_nodes['id'].str.split('/').str[:2].str.join('/')
+    # Net removals (negative totals) have no area; the wedges show each measure's share of its subtopic's emissions
+    emissions = np.clip(leaf_totals, 0, None)
+    node_emissions = aggregate(node_index, leaf_index, emissions, len(df_nodes))
+    subtopic_emissions = pd.Series(node_emissions, index=df_nodes['id']).reindex(subtopic).to_numpy()
+    with np.errstate(invalid='ignore', divide='ignore'):
+        share = np.where(subtopic_emissions > 0, node_emissions / subtopic_emissions, 0.0)
+    return df_nodes.assign(
+        value=aggregate(node_index, leaf_index, leaf_totals, len(df_nodes)),
+        share=share,
+        # Only leaves carry a size; plotly adds them up the tree (branchvalues='remainder')
+        size=np.where(is_leaf, share, 0.0),
+        depth=df_nodes['id'].str.count('/'),
+    )
+
+def hierarchy_totals(user_config: dict) -> pd.DataFrame:
+    """Hierarchy nodes with their totals over the selected years and countries (all measures of every subtopic)"""
+    version = dataset_version()
+    years, countries = tuple(user_config.get('selected_TIME_PERIOD', [])), tuple(user_config.get('selected_REF_AREA', []))
+    return tag_frame(_hierarchy_totals(version, years, countries), version, 'hierarchy', years, countries)
@@ -0,0 +1,119 @@
+"""
+Incremental Filter Module
+Contains the per-session incremental filter: a new selection is diffed against the session's previous one and only the
+rows of the added or removed countries, measures and years update the row mask and the running aggregates
+"""
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from Component.data_loader import contiguous_years, is_time_sorted, year_rows, filtered_frame
+from Component.manifest import frame_tag
+
+# user_config key -> dataset column
+FILTER_DIMENSIONS = {'selected_REF_AREA': 'REF_AREA', 'selected_MEASURE': 'MEASURE', 'selected_TIME_PERIOD': 'TIME_PERIOD'}
+# A change touching more rows than this share of the dataset is recomputed in one vectorised pass instead
+INCREMENTAL_MAX_FRACTION = 0.2
+STATE_KEY = 'incremental_filter'
+
+@st.cache_resource(show_spinner=False, max_entries=16)
+def filter_index(_df: pd.DataFrame, dataset_key) -> dict:
+    """Per filter column: row codes, sorted unique values and the rows of every value (grouped positions + offsets)"""
+    index = {}
+    for column in FILTER_DIMENSIONS.values():
+        codes, uniques = pd.factorize(_df[column], sort=True)
+        order = np.argsort(codes, kind='stable')
+        # Missing values get code -1 and sort first, outside every value's [offset, next offset) range
+        offsets = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+        for array in (codes, order, offsets):
+            array.flags.writeable = False
+        index[column] = (codes, uniques, order, offsets)
+    values = np.nan_to_num(_df['OBS_VALUE'].to_numpy(dtype=float))
+    values.flags.writeable = False
+    index['OBS_VALUE'] = values
+    return index
+
+def _lookup(selected: np.ndarray) -> np.ndarray:
+    """Membership by code, with one extra False slot so code -1 (missing value) is never selected"""
+    return np.append(selected, False)
+
+def _rows_of(index_entry: tuple, codes: np.ndarray) -> np.ndarray:
+    """Positions of the rows whose value is one of the given codes"""
+    _, _, order, offsets = index_entry
+    if len(codes) == 0:
+        return np.empty(0, dtype=np.intp)
+    return np.concatenate([order[offsets[code]:offsets[code + 1]] for code in codes])
+
+def _accumulate(state: dict, index: dict, rows: np.ndarray, sign: int):
+    """Add (sign 1) or remove (sign -1) rows from the mask and the MEASURE x TIME_PERIOD sums and counts"""
+    if len(rows) == 0:
+        return
+    n_years = state['sums'].shape[1]
+    bins = index['MEASURE'][0][rows] * n_years + index['TIME_PERIOD'][0][rows]
+    size = state['sums'].size
+    state['sums'] += sign * np.bincount(bins, weights=index['OBS_VALUE'][rows], minlength=size).reshape(state['sums'].shape)
+    state['counts'] += sign * np.bincount(bins, minlength=size).reshape(state['counts'].shape)
+    state['mask'][rows] = sign > 0
+    state['n_rows'] += sign * len(rows)
+
+def _full_state(index: dict, dataset_key, selected: dict, rows: slice) -> dict:
+    """Mask and aggregates of a selection computed over the candidate rows (the year slice, or the whole dataset)"""
+    mask = np.logical_and.reduce([_lookup(selected[column])[index[column][0][rows]] for column in selected])
+    measures, years = index['MEASURE'][1], index['TIME_PERIOD'][1]
+    state = {'dataset_key': dataset_key, 'selected': selected, 'mask': np.zeros(len(index['OBS_VALUE']), dtype=bool),
+             'measures': measures, 'years': years, 'sums': np.zeros((len(measures), len(years))),
+             'counts': np.zeros((len(measures), len(years)), dtype=np.int64), 'n_rows': 0, 'mode': 'full'}
+    _accumulate(state, index, np.flatnonzero(mask) + (rows.start or 0), 1)
+    return state
+
+def _apply_changes(state: dict, index: dict, selected: dict):
+    """Move the state to a new selection one dimension at a time, touching only the changed values' rows"""
+    for column, new in selected.items():
+        old = state['selected'][column]
+        removed, added = np.flatnonzero(old & ~new), np.flatnonzero(new & ~old)
+        rows = _rows_of(index[column], removed)
+        _accumulate(state, index, rows[state['mask'][rows]], -1)
+        old[removed] = False
+        rows = _rows_of(index[column], added)
+        # Added rows join only where every other dimension (already updated or not yet) is selected too
+        others = [_lookup(state['selected'][other])[index[other][0][rows]] for other in selected if other != column]
+        _accumulate(state, index, rows[np.logical_and.reduce(others)] if others else rows, 1)
+        old[added] = True
+    # Cells emptied by removals are reset, so subtracting large sums leaves no rounding residue
+    state['sums'][state['counts'] == 0] = 0.0
+    state['mode'] = 'incremental'
+
+def _changed_rows(index: dict, state: dict, selected: dict) -> int:
+    """Rows an incremental update would touch"""
+    total = 0
+    for column, new in selected.items():
+        offsets = index[column][3]
+        changed = np.flatnonzero(new != state['selected'][column])
+        total += int((offsets[changed + 1] - offsets[changed]).sum())
+    return total
+
+def incremental_filter(df: pd.DataFrame, user_config: dict) -> pd.DataFrame:
+    """filter_data for the session's selection, updating the previous result by the changed slice when it is small"""
+    # The tag carries the dataset version, so changed data never reuses the index or the state of the old frame
+    dataset_key = frame_tag(df) or ('untagged', id(df), len(df))
+    index = filter_index(df, dataset_key)
+    selected = {column: np.asarray(index[column][1].isin(user_config.get(config_key, [])))
+                for config_key, column in FILTER_DIMENSIONS.items()}
+    # Every selected row of a time-sorted dataset lies in the slice of the selected year range
+    years = contiguous_years(user_config.get('selected_TIME_PERIOD')) if is_time_sorted(df) else None
+    rows = year_rows(df, *years) if years else slice(None)
+    state = st.session_state.get(STATE_KEY)
+    if (state is None or state['dataset_key'] != dataset_key
+            or _changed_rows(index, state, selected) > INCREMENTAL_MAX_FRACTION * len(df)):
+        state = _full_state(index, dataset_key, selected, rows)
+        st.session_state[STATE_KEY] = state
+    else:
+        _apply_changes(state, index, selected)
+    # Same result as filter_data: the shared frame itself when everything is selected, else the masked rows
+    return filtered_frame(df, df if state['n_rows'] == len(df) else df.iloc[rows][state['mask'][rows]], user_config)
+
+def selection_totals() -> pd.DataFrame:
+    """OBS_VALUE sums of the current selection by MEASURE (rows) and TIME_PERIOD (columns), kept up to date incrementally"""
+    state = st.session_state[STATE_KEY]
+    return pd.DataFrame(state['sums'], index=state['measures'], columns=state['years'])
@@ -0,0 +1,238 @@
+"""
+Instrumentation Module
+Lightweight timing spans and allocation reports for dashboard reruns, a developer diagnostics panel
+and JSON lines export
+"""
+
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+# Every finished rerun appends its spans here as JSON lines when the variable is set
+TRACE_FILE = os.environ.get('OECD_DASHBOARD_TRACE_FILE')
+# The diagnostics panel only shows up with ?diagnostics=1 in the URL
+DIAGNOSTICS_QUERY_PARAM = 'diagnostics'
+# How many past reruns the panel keeps per session
+TRACE_HISTORY = 20
+# ?diagnostics=memory (or this variable set to 1) adds a tracemalloc allocation report to every trace
+TRACE_MEMORY = os.environ.get('OECD_DASHBOARD_TRACE_MEMORY', '').lower() in ('1', 'true', 'yes')
+# Allocation sites listed per rerun
+MEMORY_TOP_SITES = 10
+
+_current_trace = contextvars.ContextVar('current_trace', default=None)
+_current_span = contextvars.ContextVar('current_span', default=(None, -1))
+_export_lock = threading.Lock()
+# tracemalloc is process wide: it runs while at least one rerun asks for a memory report
+_memory_lock = threading.Lock()
+_memory_reruns = 0
+
+def start_rerun(scope: str = 'app') -> dict:
+    """Open a new trace that collects every span recorded during this rerun"""
+    ctx = get_script_run_ctx()
+    trace = {
+        'rerun_id': uuid.uuid4().hex[:12],
+        'session_id': ctx.session_id if ctx else 'bare',
+        'scope': scope,
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'started': time.perf_counter(),
+        'spans': [],
+    }
+    if memory_tracing_requested():
+        _start_memory_report(trace)
+    _current_trace.set(trace)
+    return trace
+
+# ============================================================================
+# ALLOCATION REPORT
+# ============================================================================
+def memory_tracing_requested() -> bool:
+    """Check whether this rerun should record a tracemalloc allocation report"""
+    return TRACE_MEMORY or st.query_params.get(DIAGNOSTICS_QUERY_PARAM, '').lower() == 'memory'
+
+def _start_memory_report(trace: dict):
+    """Start (or join) tracemalloc and remember the allocations alive at the start of the rerun"""
+    global _memory_reruns
+    with _memory_lock:
+        if _memory_reruns == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        _memory_reruns += 1
+        tracemalloc.reset_peak()
+    trace['_memory_baseline'] = tracemalloc.take_snapshot()
+    trace['_memory_start_bytes'] = tracemalloc.get_traced_memory()[0]
+
+def _finish_memory_report(trace: dict):
+    """Store net and peak allocations of the rerun plus the allocation sites that grew the most"""
+    global _memory_reruns
+    current, peak = tracemalloc.get_traced_memory()
+    snapshot = tracemalloc.take_snapshot()
+    baseline = trace.pop('_memory_baseline')
+    start_bytes = trace.pop('_memory_start_bytes')
+    # Leave the tracing machinery itself out of the report
+    own_files = (tracemalloc.__file__, __file__)
+    snapshot = snapshot.filter_traces([tracemalloc.Filter(False, filename) for filename in own_files])
+    differences = snapshot.compare_to(baseline, 'lineno')
+    trace['memory'] = {
+        'net_mib': (current - start_bytes) / 2**20,
+        # Concurrent reruns share the tracer, so the peak is an upper bound for this rerun alone
+        'peak_mib': (peak - start_bytes) / 2**20,
+        'top_sites': [
+            {
+                'site': f"{difference.traceback[0].filename}:{difference.traceback[0].lineno}",
+                'size_diff_kib': difference.size_diff / 1024,
+                'count_diff': difference.count_diff,
+            }
+            for difference in differences[:MEMORY_TOP_SITES]
+        ],
+    }
+    with _memory_lock:
+        _memory_reruns -= 1
+        if _memory_reruns == 0:
+            tracemalloc.stop()
+
+def current_trace() -> dict | None:
+    """Return the trace of the running rerun (None outside an instrumented rerun)"""
+    return _current_trace.get()
+
+@contextmanager
+def span(name: str, **attributes):
+    """Time a block of code as a span of the current rerun (a no-op when no trace is open)"""
+    trace = _current_trace.get()
+    if trace is None:
+        yield
+        return
+    parent, parent_depth = _current_span.get()
+    token = _current_span.set((name, parent_depth + 1))
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        end = time.perf_counter()
+        _current_span.reset(token)
+        trace['spans'].append({
+            'name': name,
+            'parent': parent,
+            'depth': parent_depth + 1,
+            'start_ms': (start - trace['started']) * 1000,
+            'duration_ms': (end - start) * 1000,
+            'thread': threading.current_thread().name,
+            **attributes,
+        })
+
+def timed(func=None, *, name: str | None = None):
+    """Decorator that records every call of a function (e.g. a chart builder) as a span"""
+    def decorator(f):
+        span_name = name or f.__name__
+        @functools.wraps(f)
+        def wrapper(*args, **kwargs):
+            with span(span_name):
+                return f(*args, **kwargs)
+        return wrapper
+    return decorator(func) if func is not None else decorator
+
+def traced_fragment(name: str):
+    """st.fragment whose runs are traced: a span inside a full rerun, its own trace when only the fragment reruns"""
+    def decorator(f):
+        @functools.wraps(f)
+        def wrapper(*args, **kwargs):
+            if _current_trace.get() is not None:
+                with span(name):
+                    return f(*args, **kwargs)
+            trace = start_rerun(scope=f'fragment: {name}')
+            try:
+                with span(name):
+                    return f(*args, **kwargs)
+            finally:
+                finish_rerun(trace)
+        return st.fragment(wrapper)
+    return decorator
+
+def finish_rerun(trace: dict):
+    """Close the trace, keep it in the session history and export its spans"""
+    trace['total_ms'] = (time.perf_counter() - trace['started']) * 1000
+    if '_memory_baseline' in trace:
+        _finish_memory_report(trace)
+    history = st.session_state.setdefault('_diagnostics_traces', [])
+    history.append(trace)
+    del history[:-TRACE_HISTORY]
+    if TRACE_FILE:
+        export_trace(trace, Path(TRACE_FILE))
+    _current_trace.set(None)
+
+def export_trace(trace: dict, path: Path):
+    """Append one JSON object per span (plus one for the whole rerun) to a JSON lines file"""
+    common = {'rerun_id': trace['rerun_id'], 'session_id': trace['session_id'], 'scope': trace['scope'],
+              'timestamp': trace['timestamp']}
+    lines = [json.dumps({**common, 'name': 'rerun', 'parent': None, 'depth': -1, 'start_ms': 0.0,
+                         'duration_ms': trace['total_ms'], **({'memory': trace['memory']} if 'memory' in trace else {})})]
+    lines += [json.dumps({**common, **record}, default=str) for record in trace['spans']]
+    with _export_lock:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+
+def diagnostics_enabled() -> bool:
+    """Check the query parameter that unlocks the developer diagnostics panel"""
+    return st.query_params.get(DIAGNOSTICS_QUERY_PARAM, '').lower() in ('1', 'true', 'yes', 'memory')
+
+def waterfall_figure(trace: dict) -> go.Figure:
+    """Gantt-style waterfall of the spans of one rerun, in start order"""
+    spans = sorted(trace['spans'], key=lambda record: record['start_ms'])
+    labels = [f"{'  ' * record['depth']}{record['name']}" for record in spans]
+    fig = go.Figure(go.Bar(
+        y=labels,
+        x=[record['duration_ms'] for record in spans],
+        base=[record['start_ms'] for record in spans],
+        orientation='h',
+        marker_color=['#f39c12' if record['depth'] == 0 else '#45b7d1' for record in spans],
+        hovertemplate='<b>%{y}</b><br>start: %{base:.1f} ms<br>duration: %{x:.1f} ms<extra></extra>',
+    ))
+    fig.update_layout(
+        template='plotly_dark',
+        height=max(250, 22 * len(spans) + 80),
+        margin=dict(l=10, r=10, t=30, b=10),
+        title=f"Rerun {trace['rerun_id']} ({trace.get('total_ms', 0):.0f} ms)",
+        xaxis_title='ms since rerun start',
+        yaxis=dict(autorange='reversed'),
+        showlegend=False,
+    )
+    return fig
+
+def render_diagnostics_panel(trace: dict):
+    """Sidebar panel with the waterfall of the last rerun and the totals of recent reruns"""
+    with st.sidebar.expander("🛠️ Diagnostics", expanded=True):
+        st.metric("Rerun time", f"{trace.get('total_ms', 0):.0f} ms")
+        st.plotly_chart(waterfall_figure(trace), use_container_width=True, key="diagnostics_waterfall")
+        stages = pd.DataFrame(trace['spans'])
+        if not stages.empty:
+            st.dataframe(stages[['name', 'parent', 'start_ms', 'duration_ms', 'thread']].round(1), hide_index=True)
+        history = pd.DataFrame([
+            {'rerun': past['rerun_id'], 'scope': past['scope'], 'total_ms': round(past.get('total_ms', 0), 1)}
+            for past in st.session_state.get('_diagnostics_traces', [])
+        ])
+        # Fragment reruns do not redraw this panel; they show up here on the next full rerun
+        st.caption("Recent reruns (including fragment reruns)")
+        st.dataframe(history, hide_index=True)
+        if 'memory' in trace:
+            memory = trace['memory']
+            col1, col2 = st.columns(2)
+            col1.metric("Net allocated", f"{memory['net_mib']:.1f} MiB")
+            col2.metric("Peak allocated", f"{memory['peak_mib']:.1f} MiB")
+            st.caption("Top allocation sites of this rerun")
+            st.dataframe(pd.DataFrame(memory['top_sites']).round(1), hide_index=True)
+        else:
+            st.caption("Open with `?diagnostics=memory` for a per-rerun allocation report")
+        if TRACE_FILE:
+            st.caption(f"Spans are exported to `{TRACE_FILE}`")
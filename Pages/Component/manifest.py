@@ -0,0 +1,123 @@
+"""
+Manifest Module
+Contains the dataset manifest (content hash of the catalog and of every file it lists), the dataset version derived from
+it and the small cache keys that frames carry, so caches key on (dataset version, selection) instead of hashing frames
+"""
+
+import hashlib
+import itertools
+import json
+import os
+import threading
+import time
+import weakref
+from pathlib import Path
+
+import pandas as pd
+
+# Base directory for data files
+BASE_DIR = Path(__file__).parent.parent.parent / 'DataSource'
+# The catalog maps every topic to its datasets; point OECD_DASHBOARD_CATALOG at another catalog to swap data in
+CATALOG_PATH = Path(os.environ.get('OECD_DASHBOARD_CATALOG', BASE_DIR / 'catalog.json'))
+# Written next to the catalog; a new process re-hashes only the files whose size or modification time changed
+MANIFEST_PATH = CATALOG_PATH.parent / 'dataset_manifest.json'
+# The files are checked (one stat each) at most this often per process; a changed file is hashed once
+MANIFEST_CHECK_SECONDS = 2.0
+
+_manifest_lock = threading.Lock()
+_manifest_state = {'checked': 0.0, 'manifest': None}
+# Tagged frames by token: a key is only valid on the frame it was attached to (not on frames that copied its attrs)
+_tagged_frames = weakref.WeakValueDictionary()
+_tag_tokens = itertools.count()
+
+def file_hash(path: Path) -> str:
+    """SHA-256 of a file's content"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def catalog_files(catalog_path: Path = CATALOG_PATH) -> list[Path]:
+    """The catalog itself and every file it lists"""
+    with open(catalog_path, encoding='utf-8') as f:
+        raw_catalog = json.load(f)
+    return [catalog_path] + [catalog_path.parent / file_path for entries in raw_catalog.values() for file_path in entries.values()]
+
+def build_manifest(previous: dict | None = None, catalog_path: Path = CATALOG_PATH) -> dict:
+    """Content hash of every catalog file (reused from `previous` while size and mtime match) and the dataset version"""
+    previous_files = (previous or {}).get('files', {})
+    files = {}
+    for path in catalog_files(catalog_path):
+        if not path.exists():
+            continue
+        # Names relative to the catalog keep the version identical on every host with the same data
+        name = os.path.relpath(path, catalog_path.parent)
+        stat = path.stat()
+        entry = previous_files.get(name)
+        if not entry or entry['size'] != stat.st_size or entry['mtime_ns'] != stat.st_mtime_ns:
+            entry = {'sha256': file_hash(path), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+        files[name] = entry
+    fingerprint = '|'.join(f"{name}:{entry['sha256']}" for name, entry in sorted(files.items()))
+    return {'version': hashlib.sha256(fingerprint.encode()).hexdigest()[:16], 'files': files}
+
+def read_manifest(path: Path = MANIFEST_PATH) -> dict | None:
+    """The manifest written by an earlier process, or None"""
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def write_manifest(manifest: dict, path: Path = MANIFEST_PATH):
+    """Write the manifest atomically; a read-only data folder only costs the next process its hashing"""
+    try:
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(manifest, indent=2, sort_keys=True), encoding='utf-8')
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+
+def dataset_manifest() -> dict:
+    """The current manifest, re-checked against the files at most every MANIFEST_CHECK_SECONDS"""
+    with _manifest_lock:
+        now = time.monotonic()
+        if _manifest_state['manifest'] is None or now - _manifest_state['checked'] >= MANIFEST_CHECK_SECONDS:
+            previous = _manifest_state['manifest'] or read_manifest()
+            manifest = build_manifest(previous)
+            if manifest != previous:
+                write_manifest(manifest)
+            _manifest_state['manifest'], _manifest_state['checked'] = manifest, now
+        return _manifest_state['manifest']
+
+def dataset_version() -> str:
+    """Version of the data on disk: changes whenever the content of the catalog or of any listed file changes"""
+    return dataset_manifest()['version']
+
+# ============================================================================
+# FRAME CACHE KEYS
+# ============================================================================
+def data_hash(df: pd.DataFrame) -> str:
+    """Content hash of a frame (values, index, column names and dtypes), stable across processes"""
+    digest = hashlib.sha256(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    digest.update(repr([(str(column), str(dtype)) for column, dtype in df.dtypes.items()]).encode())
+    return digest.hexdigest()[:16]
+
+def tag_frame(df: pd.DataFrame, *key) -> pd.DataFrame:
+    """Attach the small key that describes how a frame was derived (dataset version, names, selection)"""
+    # pandas copies attrs to frames derived from this one; the token still points at this frame, so their copy is
+    # ignored. Tokens are plain ints, so tagged frames stay picklable (an unpickled copy is hashed by content).
+    token = next(_tag_tokens)
+    _tagged_frames[token] = df
+    df.attrs['cache_key'] = (token, key)
+    return df
+
+def frame_tag(df: pd.DataFrame) -> tuple | None:
+    """The key attached to this very frame, None when it has none (or only a copy inherited from its source)"""
+    tagged = df.attrs.get('cache_key')
+    return tagged[1] if tagged is not None and _tagged_frames.get(tagged[0]) is df else None
+
+def frame_key(df: pd.DataFrame):
+    """Cache key of a frame: its tag when it carries one, otherwise the hash of its content"""
+    tag = frame_tag(df)
+    return tag if tag is not None else data_hash(df)
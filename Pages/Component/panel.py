@@ -0,0 +1,83 @@
+"""
+Panel Module
+Contains the materialized country-year panel: every indicator (GHS output per subtopic and measure, environmental
+factors, population, nutrient totals) as a column of one wide frame keyed by (REF_AREA, TIME_PERIOD)
+"""
+
+import pandas as pd
+import streamlit as st
+
+from Component.data_loader import (load_catalog, load_dataframe_for_subtopic, load_dataframe_for_interested_correlational_env_indicator,
+                                   load_population, load_nutrient_datasets, freeze_frame, selection_key)
+from Component.manifest import dataset_version, frame_tag, tag_frame
+from Component.shared_store import STORE_DIR, STORE_FORMAT_VERSION, store_enabled, write_frame, map_frame
+
+KEYS = ['REF_AREA', 'TIME_PERIOD']
+POPULATION = 'POPULATION'
+
+def ghs_column(subtopic: str, measure: str) -> str:
+    """Panel column of one greenhouse gas measure of a subtopic"""
+    return f"GHS|{subtopic}|{measure}"
+
+def nutrient_column(name: str) -> str:
+    """Panel column of one nutrient dataset's total"""
+    return f"NUTRIENT|{name}"
+
+def _keyed_sum(df: pd.DataFrame, by: list[str] = KEYS) -> pd.DataFrame | pd.Series:
+    """Sum of OBS_VALUE per key (NaN when a key has no value at all)"""
+    return df.groupby(by)['OBS_VALUE'].sum(min_count=1)
+
+def build_panel() -> pd.DataFrame:
+    """Pivot every dataset of the catalog to one column per indicator and join them on (REF_AREA, TIME_PERIOD)"""
+    columns = []
+    for subtopic, df in load_dataframe_for_subtopic('Greenhouse Gas').items():
+        by_measure = _keyed_sum(df, KEYS + ['MEASURE']).unstack('MEASURE')
+        columns.append(by_measure.rename(columns=lambda measure: ghs_column(subtopic, measure)))
+    for factor in load_catalog().get('Environmental Factors', {}):
+        df = load_dataframe_for_interested_correlational_env_indicator(factor)
+        if not df.empty:
+            columns.append(_keyed_sum(df).rename(factor))
+    columns.append(_keyed_sum(load_population()).rename(POPULATION))
+    for name, df in load_nutrient_datasets().items():
+        columns.append(_keyed_sum(df).rename(nutrient_column(name)))
+    panel = pd.concat(columns, axis=1).sort_index()
+    panel.columns = [str(column) for column in panel.columns]
+    return panel.reset_index()
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def load_panel(version: str) -> pd.DataFrame:
+    """The panel of one data version as a read-only frame, built once (and mapped from the shared store when enabled)"""
+    if not store_enabled():
+        return freeze_frame(build_panel())
+    path = STORE_DIR / f"panel-{version}-{STORE_FORMAT_VERSION}.arrow"
+    if not path.exists():
+        write_frame(build_panel(), path)
+    return map_frame(path)
+
+def current_panel() -> pd.DataFrame:
+    """The panel of the data on disk"""
+    return load_panel(dataset_version())
+
+def selection_view(user_config: dict, subtopic: str, columns: list[str]) -> pd.DataFrame:
+    """Country-years of a selection with their GHS total (selected measures) and the requested indicator columns"""
+    version = dataset_version()
+    panel = load_panel(version)
+    rows = (panel['REF_AREA'].isin(user_config.get('selected_REF_AREA', []))
+            & panel['TIME_PERIOD'].isin(user_config.get('selected_TIME_PERIOD', [])))
+    ghs_columns = [ghs_column(subtopic, measure) for measure in user_config.get('selected_MEASURE', [])]
+    ghs_columns = [column for column in ghs_columns if column in panel.columns]
+    view = panel.loc[rows, KEYS + [column for column in columns if column in panel.columns]]
+    view = view.assign(GHS=panel.loc[rows, ghs_columns].sum(axis=1, min_count=1))
+    # Country-years without output for any selected measure are not part of the selection
+    view = view[view['GHS'].notna()].reset_index(drop=True)
+    return tag_frame(view, version, 'panel', subtopic, selection_key(user_config), tuple(columns))
+
+def indicator_long(df_view: pd.DataFrame, column: str) -> pd.DataFrame:
+    """One indicator of a selection view in the long layout of the datasets (MEASURE is the indicator name)"""
+    values = df_view[df_view[column].notna()]
+    df_long = pd.DataFrame({'REF_AREA': values['REF_AREA'], 'TIME_PERIOD': values['TIME_PERIOD'],
+                            'MEASURE': column, 'OBS_VALUE': values[column]}).reset_index(drop=True)
+    tag = frame_tag(df_view)
+    # Keyed without the view's column list: the rows depend only on the selection, so views built with other
+    # columns (the dashboard's [factor], the warm-up's [factor, POPULATION]) share the cached figures
+    return df_long if tag is None else tag_frame(df_long, *tag[:-1], 'long', column)
@@ -0,0 +1,80 @@
+"""
+Resolution Module
+Contains the time resolution layer of the charts: N-year buckets, shape-preserving downsampling of line charts and
+point budgets derived from the chart width
+"""
+
+import math
+import numpy as np
+import pandas as pd
+
+# Choices of the "Time Resolution" sidebar control; "Auto" picks the bucket size from each chart's point budget
+RESOLUTION_OPTIONS = ['Auto', '1 year', '2 years', '5 years', '10 years']
+# Horizontal pixels a point needs to stay distinguishable: bars need room for their labels, line vertices much less
+PIXELS_PER_BAR = 24
+PIXELS_PER_LINE_POINT = 4
+# Animated maps render one choropleth per frame
+MAX_ANIMATION_FRAMES = 40
+# Columns the time-based charts read; anything else is dropped when years are bucketed
+_CHART_COLUMNS = ['REF_AREA', 'MEASURE', 'TIME_PERIOD', 'OBS_VALUE']
+
+def point_budget(width_px: int, pixels_per_point: int) -> int:
+    """Number of x positions a chart of the given width can show legibly"""
+    return max(2, width_px // pixels_per_point)
+
+def bucket_size(n_years: int, budget: int | None, resolution: str = 'Auto') -> int:
+    """Years per bucket: the explicit choice, or on "Auto" the smallest size that fits the budget (None: every year)"""
+    if resolution != 'Auto':
+        return int(resolution.split()[0])
+    return 1 if budget is None else max(1, math.ceil(n_years / budget))
+
+def bucket_years(df: pd.DataFrame, years: int) -> pd.DataFrame:
+    """Average every country and measure over N-year buckets, labelled by the first year of the bucket"""
+    if years <= 1 or df.empty:
+        return df
+    first_year = int(df['TIME_PERIOD'].min())
+    bucketed = df[_CHART_COLUMNS].assign(TIME_PERIOD=first_year + (df['TIME_PERIOD'] - first_year) // years * years)
+    return bucketed.groupby(['REF_AREA', 'MEASURE', 'TIME_PERIOD'], as_index=False, sort=False)['OBS_VALUE'].mean()
+
+def time_resolution(df: pd.DataFrame, budget: int | None, resolution: str = 'Auto') -> tuple[pd.DataFrame, str | None]:
+    """Bucket the years of a chart's data to fit its budget; returns the data and a note for the user (None if unchanged)"""
+    n_years = df['TIME_PERIOD'].nunique()
+    years = bucket_size(n_years, budget, resolution)
+    if years <= 1 or n_years <= 1:
+        return df, None
+    bucketed = bucket_years(df, years)
+    note = (f"ℹ️ Aggregated to {years}-year averages ({n_years} years shown as {bucketed['TIME_PERIOD'].nunique()} "
+            f"points, each labelled by its first year)")
+    return bucketed, note
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets: indices of `threshold` points that keep the visual shape of a series"""
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=float)
+    y = np.nan_to_num(np.asarray(y, dtype=float))
+    # The first and last points are always kept; the points in between are split into threshold - 2 buckets
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    selected = np.empty(threshold, dtype=int)
+    selected[0], selected[-1] = 0, n - 1
+    previous = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        # Average of the next bucket (the last point for the final bucket) is the third corner of the triangle
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        next_x, next_y = x[end:next_end].mean(), y[end:next_end].mean()
+        areas = np.abs((x[previous] - next_x) * (y[start:end] - y[previous])
+                       - (x[previous] - x[start:end]) * (next_y - y[previous]))
+        previous = start + int(np.argmax(areas))
+        selected[i + 1] = previous
+    return selected
+
+def downsample_wide(df_wide: pd.DataFrame, x_column: str, guide_column: str, budget: int) -> tuple[pd.DataFrame, str | None]:
+    """Keep the rows of a wide (one column per series) frame that preserve the shape of its guide series"""
+    if len(df_wide) <= budget:
+        return df_wide, None
+    # All series share the selected x positions, so stacked areas still line up
+    rows = lttb_indices(df_wide[x_column].to_numpy(), df_wide[guide_column].to_numpy(), budget)
+    note = f"Downsampled to {len(rows)} of {len(df_wide)} points (shape-preserving)"
+    return df_wide.iloc[rows].reset_index(drop=True), note
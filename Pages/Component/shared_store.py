@@ -0,0 +1,77 @@
+"""
+Shared Store Module
+Memory-mapped Arrow IPC copies of the datasets that every Streamlit worker process on a host attaches to read-only
+"""
+
+import hashlib
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+# Folder of the .arrow files; put it on tmpfs (e.g. /dev/shm/oecd-dashboard) so the pages live in shared memory.
+# Unset, every process reads the CSV files into its own memory as before.
+STORE_DIR = Path(os.environ['OECD_DASHBOARD_SHARED_STORE']) if os.environ.get('OECD_DASHBOARD_SHARED_STORE') else None
+# Bump when the stored layout or the preparation of a dataset changes
+STORE_FORMAT_VERSION = 1
+
+# From pandas 3.0 text columns are Arrow-backed and can point straight into the mapped file
+_ARROW_STRINGS = isinstance(pd.Series(['a']).array, pd.arrays.ArrowStringArray)
+
+def store_enabled() -> bool:
+    """Check whether the datasets are served from the shared store"""
+    return STORE_DIR is not None
+
+def store_path(source_path: Path, variant: str = '') -> Path:
+    """Location of the stored copy of a source file, versioned by its size and modification time"""
+    stat = source_path.stat()
+    # Identifies the source and variant, so copies of same-named files or other variants are never taken as stale
+    source_key = hashlib.sha256(f"{source_path.resolve()}|{variant}".encode()).hexdigest()[:8]
+    fingerprint = f"{source_path.resolve()}|{stat.st_size}|{stat.st_mtime_ns}|{variant}|{STORE_FORMAT_VERSION}"
+    return STORE_DIR / f"{source_path.stem}-{source_key}-{hashlib.sha256(fingerprint.encode()).hexdigest()[:16]}.arrow"
+
+def write_frame(df: pd.DataFrame, path: Path):
+    """Write a frame as an Arrow IPC file; concurrent writers are safe because the file is renamed into place"""
+    arrays = []
+    for column in df.columns:
+        values = df[column].array
+        if isinstance(values, pd.arrays.ArrowStringArray):
+            # Public Arrow protocol of the extension array: hands over its buffers without a copy
+            arrays.append(pa.array(values))
+        elif values.dtype.kind in 'iuf':
+            # Numpy-backed numbers keep NaN as a value (no validity bitmap), so they can be mapped back zero-copy
+            arrays.append(pa.array(np.asarray(values)))
+        else:
+            arrays.append(pa.array(np.asarray(values, dtype=object), from_pandas=True))
+    table = pa.Table.from_arrays(arrays, names=[str(column) for column in df.columns])
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    with pa.OSFile(str(tmp_path), 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    os.replace(tmp_path, path)
+    # Older versions of the same dataset (everything before the last '-' is equal) are no longer needed;
+    # processes still mapping them keep their pages
+    prefix = path.name.rsplit('-', 1)[0]
+    for stale in path.parent.glob(f"{prefix}-*.arrow"):
+        if stale != path and stale.name.rsplit('-', 1)[0] == prefix:
+            stale.unlink(missing_ok=True)
+
+def map_frame(path: Path) -> pd.DataFrame:
+    """Attach to a stored dataset: numeric and text columns point into the memory-mapped file (read-only)"""
+    table = pa.ipc.open_file(pa.memory_map(str(path), 'r')).read_all()
+    columns = {}
+    for name in table.column_names:
+        column = table[name].combine_chunks() if table[name].num_chunks != 1 else table[name].chunk(0)
+        if (pa.types.is_string(column.type) or pa.types.is_large_string(column.type)) and _ARROW_STRINGS:
+            columns[name] = pd.arrays.ArrowStringArray(pa.chunked_array([column]), dtype=pd.StringDtype('pyarrow', na_value=np.nan))
+            continue
+        try:
+            values = column.to_numpy(zero_copy_only=True)
+        except pa.ArrowInvalid:
+            # Nulls, booleans and Python objects need a private copy
+            values = column.to_numpy(zero_copy_only=False)
+            values.flags.writeable = False
+        columns[name] = values
+    return pd.DataFrame(columns, copy=False)
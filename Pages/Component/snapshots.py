@@ -0,0 +1,61 @@
+"""
+Snapshots Module
+Pre-rendered figure JSON built offline by Tools/build_snapshots.py and served by cached_chart for matching inputs
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import pandas as pd
+import plotly.graph_objects as go
+import plotly.io as pio
+import streamlit as st
+
+from Component.instrumentation import span
+from Component.manifest import BASE_DIR, frame_key
+
+# Snapshots live next to the data; OECD_DASHBOARD_SNAPSHOT_DIR points the dashboard at another build
+SNAPSHOT_DIR = Path(os.environ.get('OECD_DASHBOARD_SNAPSHOT_DIR', BASE_DIR / 'snapshots'))
+MANIFEST_NAME = 'manifest.json'
+# The chart builders and the modules that shape their figures or inputs (bucketing and downsampling, filters, panel
+# views, sunburst nodes, correlations); any change to them invalidates every snapshot built before it
+CHART_MODULES = ['chart_components.py', 'resolution.py', 'data_loader.py', 'panel.py', 'hierarchy.py', 'correlation.py']
+CHART_CODE_VERSION = hashlib.sha256(b''.join((Path(__file__).parent / name).read_bytes() for name in CHART_MODULES)).hexdigest()[:16]
+
+def snapshot_key(builder_name: str, args: tuple) -> str:
+    """Identify one figure by the builder code version, the builder and the key of every input"""
+    parts = [CHART_CODE_VERSION, builder_name]
+    # Tagged frames are identified by (dataset version, selection), which is the same in every process
+    parts += [repr(frame_key(arg)) if isinstance(arg, pd.DataFrame) else repr(arg) for arg in args]
+    return hashlib.sha256('|'.join(parts).encode()).hexdigest()[:24]
+
+def snapshot_index(snapshot_dir: str = str(SNAPSHOT_DIR)) -> dict[str, dict]:
+    """The snapshot entries of the current build; a re-run of build_snapshots.py is picked up without a restart"""
+    manifest_path = Path(snapshot_dir) / MANIFEST_NAME
+    try:
+        mtime_ns = manifest_path.stat().st_mtime_ns
+    except OSError:
+        return {}
+    return _read_index(str(manifest_path), mtime_ns)
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def _read_index(manifest_path: str, mtime_ns: int) -> dict[str, dict]:
+    """Read one version of the build manifest, keeping only entries built from the current chart code"""
+    with open(manifest_path, encoding='utf-8') as f:
+        manifest = json.load(f)
+    if manifest.get('chart_code_version') != CHART_CODE_VERSION:
+        return {}
+    return manifest['snapshots']
+
+def load_snapshot(builder_name: str, args: tuple) -> go.Figure | None:
+    """Return the pre-rendered figure for these inputs, or None when the build has none"""
+    index = snapshot_index()
+    if not index:
+        return None
+    entry = index.get(snapshot_key(builder_name, args))
+    if entry is None:
+        return None
+    with span(f"{builder_name} (snapshot)"):
+        return pio.from_json((SNAPSHOT_DIR / entry['file']).read_text(encoding='utf-8'), skip_invalid=True)
@@ -112,7 +112,7 @@ def summary_statistics(df: pd.DataFrame, user_config: dict[str, str]) -> pd.Data
     summary_df = summary_df[['DESCRIPTION', 'START_VALUE', 'END_VALUE', 'PERCENTAGE_CHANGE']]
     return summary_df
 
-def summary_statistics(df: pd.DataFrame):
+def summary_statistics(df: pd.DataFrame, totals: pd.DataFrame | None = None):
     # Summary Statistics section with enhanced styling
     st.markdown("""
     <div style="text-align: center; margin: 40px 0 30px 0;">
@@ -274,10 +274,15 @@ def summary_statistics(df: pd.DataFrame):
     summary_stats = []
     start_year = st.session_state.user_config['selected_TIME_PERIOD'][0]
     end_year = st.session_state.user_config['selected_TIME_PERIOD'][-1]
+    # MEASURE x TIME_PERIOD sums: the running totals of the incremental filter, or one groupby of the selection
+    if totals is None:
+        totals = df[df['TIME_PERIOD'].isin([start_year, end_year])].groupby(['MEASURE', 'TIME_PERIOD'])['OBS_VALUE'].sum().unstack()
+    # A single-year range has start_year == end_year; reindexing on it twice would duplicate the column
+    years = list(dict.fromkeys([start_year, end_year]))
+    totals = totals.reindex(index=st.session_state.user_config['selected_MEASURE'], columns=years).fillna(0)
     for measure in st.session_state.user_config['selected_MEASURE']:
-        measure_df = df[df['MEASURE'] == measure]
-        start_value = measure_df[measure_df['TIME_PERIOD'] == start_year]['OBS_VALUE'].sum()
-        end_value = measure_df[measure_df['TIME_PERIOD'] == end_year]['OBS_VALUE'].sum()
+        start_value = totals.at[measure, start_year]
+        end_value = totals.at[measure, end_year]
         
         if start_value > 0:
             percentage_change = ((end_value - start_value) / start_value) * 100
@@ -0,0 +1,134 @@
+"""
+Warm-up Module
+Pre-loads the catalog datasets and pre-builds the default and popular dashboard figures in a background thread
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+
+import streamlit as st
+
+from Component.chart_components import (cached_chart, sunburst, static_map, bar_line, pie, multi_line,
+                                        animated_hor_bar, static_bubble, water_fall)
+from Component.data_loader import (BASE_DIR, load_catalog, load_dataframe_for_subtopic,
+                                   load_dataframe_for_interested_correlational_env_indicator, load_population,
+                                   load_population_median, load_nutrient_datasets, filter_data)
+from Component.panel import POPULATION, current_panel, selection_view, indicator_long
+from Component.hierarchy import hierarchy_totals
+
+logger = logging.getLogger(__name__)
+
+# Set OECD_DASHBOARD_WARMUP=0 to skip the warm-up (e.g. while developing)
+WARMUP_ENABLED = os.environ.get('OECD_DASHBOARD_WARMUP', '1').lower() not in ('0', 'false', 'no')
+# Extra configurations to pre-build, as a JSON list of configs (see DEFAULT_CONFIG for the keys)
+POPULAR_CONFIGS_PATH = Path(os.environ.get('OECD_DASHBOARD_POPULAR_CONFIGS', BASE_DIR / 'popular_configs.json'))
+
+# What a new session sees: the first subtopic, the first 10 countries, the first 3 measures and every year (maps are
+# cached without a projection, so they serve every projection). countries/measures take a count (first N in sorted
+# order), a list of codes or "all"; years takes null (full range) or [start, end].
+DEFAULT_CONFIG = {
+    'name': 'default',
+    'subtopic': 'Without LULUCF',
+    'countries': 10,
+    'measures': 3,
+    'years': None,
+    'env_factor': None,
+}
+
+# Progress of the warm-up of this process, for logs and the diagnostics panel
+WARMUP_STATUS = {'state': 'idle', 'configs': []}
+
+def load_popular_configs(path: Path = POPULAR_CONFIGS_PATH) -> list[dict]:
+    """Read the popular configurations, each completed with the defaults"""
+    if not path.exists():
+        return []
+    with open(path, encoding='utf-8') as f:
+        return [{**DEFAULT_CONFIG, **config} for config in json.load(f)]
+
+def _pick(values: list, choice) -> list:
+    """Resolve a countries/measures choice against the sorted values of the dataset"""
+    if choice == 'all':
+        return values
+    if isinstance(choice, int):
+        return values[:choice]
+    return [value for value in choice if value in values]
+
+def config_to_user_config(df, config: dict) -> dict[str, list]:
+    """Translate a warm-up config into the selection user_config() returns for the same widget values"""
+    all_years = sorted(df['TIME_PERIOD'].dropna().unique().tolist())
+    start, end = config['years'] or (min(all_years), max(all_years))
+    return {
+        "selected_TIME_PERIOD": range(start, end + 1),
+        "selected_REF_AREA": _pick(sorted(df['REF_AREA'].dropna().unique().tolist()), config['countries']),
+        "selected_MEASURE": _pick(sorted(df['MEASURE'].dropna().unique().tolist()), config['measures']),
+    }
+
+def preload_datasets():
+    """Load every dataset listed in the catalog into the shared loader caches"""
+    catalog = load_catalog()
+    load_dataframe_for_subtopic('Greenhouse Gas')
+    for indicator in catalog.get('Environmental Factors', {}):
+        load_dataframe_for_interested_correlational_env_indicator(indicator)
+    load_population()
+    load_population_median()
+    load_nutrient_datasets()
+    current_panel()
+
+def default_figure_jobs(config: dict) -> list[tuple]:
+    """(builder, args) of every figure a session with this configuration and the default widget values renders"""
+    df = load_dataframe_for_subtopic('Greenhouse Gas')[config['subtopic']]
+    user_config = config_to_user_config(df, config)
+    df_filtered = filter_data(df, user_config)
+    env_factor = config['env_factor'] or next(iter(load_catalog()['Environmental Factors']))
+    df_view = selection_view(user_config, config['subtopic'], [env_factor, POPULATION])
+    # Same arguments as the dashboard with its default widget values (x axis REF_AREA, category MEASURE, ...)
+    return [
+        (sunburst, (hierarchy_totals(user_config),)),
+        (static_map, (df_filtered,)),
+        (bar_line, (df_filtered, 'REF_AREA', 'MEASURE', 'GHS Gas Type')),
+        (pie, (df_filtered, 'MEASURE', 'GHS Gas Type', "Show all contributors to GHS Emissions")),
+        (multi_line, (df_filtered, 'REF_AREA', 'MEASURE', 'GHS Gas Type', "line")),
+        (animated_hor_bar, (df_filtered, 'MEASURE')),
+        (static_bubble, (df_view, env_factor)),
+        (water_fall, (indicator_long(df_view, env_factor), 'REF_AREA', 'MEASURE', env_factor)),
+    ]
+
+def prebuild_figures(config: dict):
+    """Build the figures of one configuration into the cached_chart caches"""
+    for builder, args in default_figure_jobs(config):
+        cached_chart(builder)(*args)
+
+def run_warmup(configs: list[dict]):
+    """Pre-load the datasets, then pre-build the figures of every configuration; failures are logged and skipped"""
+    WARMUP_STATUS['state'] = 'running'
+    started = time.perf_counter()
+    try:
+        preload_datasets()
+    except Exception:
+        logger.exception("Warm-up could not pre-load the datasets")
+    WARMUP_STATUS['configs'].append({'name': 'datasets', 'seconds': time.perf_counter() - started, 'error': None})
+    for config in configs:
+        config_started = time.perf_counter()
+        error = None
+        try:
+            prebuild_figures(config)
+        except Exception as e:
+            error = repr(e)
+            logger.exception("Warm-up failed for %s", config['name'])
+        WARMUP_STATUS['configs'].append({'name': config['name'], 'seconds': time.perf_counter() - config_started, 'error': error})
+    WARMUP_STATUS['state'] = 'done'
+    logger.info("Cache warm-up finished in %.1f s", time.perf_counter() - started)
+
+@st.cache_resource(show_spinner=False)
+def start_warmup() -> threading.Thread | None:
+    """Start the warm-up once per process in a daemon thread, so no session waits for it"""
+    if not WARMUP_ENABLED:
+        return None
+    configs = [DEFAULT_CONFIG] + load_popular_configs()
+    thread = threading.Thread(target=run_warmup, args=(configs,), name='cache-warmup', daemon=True)
+    thread.start()
+    return thread
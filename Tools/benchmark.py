@@ -0,0 +1,328 @@
+"""
+Benchmark Module
+Times the chart builders, summary statistics, loaders and filters of the OECD Dashboard
+on the real DataSource files and on synthetic inputs scaled in countries, measures and years.
+
+Usage:
+    python Tools/benchmark.py run --output bench.json
+    python Tools/benchmark.py run --scales 1 10 --filter "static_map|bar_line"
+    python Tools/benchmark.py compare baseline.json bench.json --threshold 0.25
+"""
+
+import argparse
+import json
+import logging
+import platform
+import re
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Make the dashboard modules importable the same way main.py does
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path[:0] = [str(ROOT_DIR), str(ROOT_DIR / 'Pages')]
+
+import numpy as np
+import pandas as pd
+import plotly
+import streamlit as st
+from streamlit import config as streamlit_config
+from streamlit import logger as streamlit_logger
+
+# Outside `streamlit run` Streamlit warns about the missing runtime and ScriptRunContext on every call. Parsing the
+# config re-applies logger.level ("info") to every Streamlit logger, so it is parsed first and the level set after it
+streamlit_config.get_config_options()
+streamlit_config.set_option('global.showWarningOnDirectExecution', False)
+streamlit_logger.set_log_level(logging.ERROR)
+
+from Component import chart_components
+from Component import data_loader
+from Component import hierarchy
+from Component import panel
+from Pages.Component import summary_statistics
+
+DEFAULT_SCALES = [1, 10, 100, 1000]
+DEFAULT_SUBTOPIC = 'Without LULUCF'
+DEFAULT_ENV_FACTOR = 'Agricultural Energy Consumption (Tonnes of oil equivalent)'
+
+# ============================================================================
+# SCALED INPUTS
+# ============================================================================
+def _axis_multipliers(scale: int) -> tuple[int, int, int]:
+    """Split a row scale factor into (countries, measures, years) multipliers whose product is the scale"""
+    multipliers = [1, 1, 1]
+    remaining = scale
+    prime_factors = []
+    divisor = 2
+    while remaining > 1:
+        while remaining % divisor == 0:
+            prime_factors.append(divisor)
+            remaining //= divisor
+        divisor += 1
+    # Largest factors first, always growing the smallest axis keeps the three axes balanced
+    for factor in sorted(prime_factors, reverse=True):
+        smallest = multipliers.index(min(multipliers))
+        multipliers[smallest] *= factor
+    return multipliers[0], multipliers[1], multipliers[2]
+
+def scale_dataset(df: pd.DataFrame, scale: int, seed: int = 0) -> pd.DataFrame:
+    """Tile an OECD-shaped frame so it has `scale` times the rows, spread over countries, measures and years"""
+    if scale == 1:
+        return df
+    country_mult, measure_mult, year_mult = _axis_multipliers(scale)
+    rng = np.random.default_rng(seed)
+    year_span = int(df['TIME_PERIOD'].max() - df['TIME_PERIOD'].min() + 1)
+    copies = []
+    for c in range(country_mult):
+        for m in range(measure_mult):
+            for y in range(year_mult):
+                copy = df.copy()
+                if c:
+                    copy['REF_AREA'] = copy['REF_AREA'] + f'_{c}'
+                if m:
+                    copy['MEASURE'] = copy['MEASURE'] + f'_{m}'
+                if y:
+                    # Extend the series backwards so the most recent years stay real
+                    copy['TIME_PERIOD'] = copy['TIME_PERIOD'] - year_span * y
+                copies.append(copy)
+    scaled = pd.concat(copies, ignore_index=True)
+    # Jitter the values so copies do not aggregate to identical figures
+    scaled['OBS_VALUE'] = scaled['OBS_VALUE'] * rng.uniform(0.9, 1.1, len(scaled))
+    return scaled
+
+def full_config(df: pd.DataFrame) -> dict[str, list]:
+    """Build a user config that selects every year, country and measure of the frame"""
+    return {
+        "selected_TIME_PERIOD": sorted(df['TIME_PERIOD'].dropna().unique().tolist()),
+        "selected_REF_AREA": sorted(df['REF_AREA'].dropna().unique().tolist()),
+        "selected_MEASURE": sorted(df['MEASURE'].dropna().unique().tolist()),
+    }
+
+def panel_view(df: pd.DataFrame, df_env: pd.DataFrame) -> pd.DataFrame:
+    """Stand-in for a panel selection view of scaled inputs: GHS total, the factor and population per country-year"""
+    keys = ['REF_AREA', 'TIME_PERIOD']
+    ghs = df.groupby(keys)['OBS_VALUE'].sum().rename('GHS')
+    factor = df_env.groupby(keys)['OBS_VALUE'].sum().rename(DEFAULT_ENV_FACTOR)
+    population = data_loader.load_population().groupby(keys)['OBS_VALUE'].sum().rename(panel.POPULATION)
+    return pd.concat([ghs, factor, population], axis=1).reindex(ghs.index).reset_index()
+
+# ============================================================================
+# BENCHMARK CASES
+# ============================================================================
+def _clear_loader_caches():
+    data_loader._load_subtopics.clear()
+    data_loader._load_env_indicator.clear()
+
+def _summary_statistics(inputs: dict):
+    st.session_state.user_config = inputs['config']
+    # The summary only renders Streamlit elements, which are no-ops outside `streamlit run`
+    summary_statistics.summary_statistics(inputs['df'])
+
+# name -> (callable taking the prepared inputs, runs on real data only)
+BENCHMARKS = {
+    'data_loader.load_dataframe_for_subtopic': (
+        lambda inputs: (_clear_loader_caches(), data_loader.load_dataframe_for_subtopic('Greenhouse Gas')), True),
+    'data_loader.load_dataframe_for_interested_correlational_env_indicator': (
+        lambda inputs: (_clear_loader_caches(), data_loader.load_dataframe_for_interested_correlational_env_indicator(DEFAULT_ENV_FACTOR)), True),
+    'panel.build_panel': (lambda inputs: panel.build_panel(), True),
+    'panel.selection_view': (
+        lambda inputs: panel.selection_view(inputs['config'], DEFAULT_SUBTOPIC, [DEFAULT_ENV_FACTOR, panel.POPULATION]), True),
+    'data_loader.filter_data': (
+        lambda inputs: data_loader.filter_data(inputs['df'], inputs['config']), False),
+    'summary_statistics.summary_statistics': (_summary_statistics, False),
+    'chart_components.get_color_mapping': (
+        lambda inputs: chart_components.get_color_mapping(inputs['df'], 'MEASURE'), False),
+    'hierarchy.hierarchy_totals': (
+        lambda inputs: (hierarchy._hierarchy_totals.clear(), hierarchy.hierarchy_totals(inputs['config'])), True),
+    'chart_components.sunburst': (
+        lambda inputs: chart_components.sunburst(hierarchy.hierarchy_totals(inputs['config'])), True),
+    'chart_components.static_map': (
+        lambda inputs: chart_components.static_map(inputs['df']), False),
+    'chart_components.animated_map': (
+        lambda inputs: chart_components.animated_map(inputs['df']), False),
+    'chart_components.bar_line[REF_AREA]': (
+        lambda inputs: chart_components.bar_line(inputs['df'], 'REF_AREA', 'MEASURE', 'GHS Gas Type'), False),
+    'chart_components.bar_line[TIME_PERIOD]': (
+        lambda inputs: chart_components.bar_line(inputs['df'], 'TIME_PERIOD', 'MEASURE', 'GHS Gas Type'), False),
+    'chart_components.percentage_bar_line': (
+        lambda inputs: chart_components.percentage_bar_line(inputs['df'], 'REF_AREA', 'MEASURE', 'GHS Gas Type'), False),
+    'chart_components.pie': (
+        lambda inputs: chart_components.pie(inputs['df'], 'MEASURE', 'GHS Gas Type', "Show all contributors to GHS Emissions"), False),
+    'chart_components.tree_map': (
+        lambda inputs: chart_components.tree_map(inputs['df'], 'MEASURE', 'GHS Gas Type', "Show all contributors to GHS Emissions"), False),
+    'chart_components.multi_line[line]': (
+        lambda inputs: chart_components.multi_line(inputs['df'], 'REF_AREA', 'MEASURE', 'GHS Gas Type', 'line'), False),
+    'chart_components.multi_line[area]': (
+        lambda inputs: chart_components.multi_line(inputs['df'], 'REF_AREA', 'MEASURE', 'GHS Gas Type', 'area'), False),
+    'chart_components.bar_line_views': (
+        lambda inputs: chart_components.bar_line_views(inputs['df'], 'REF_AREA', 'MEASURE', 'GHS Gas Type'), False),
+    'chart_components.share_views': (
+        lambda inputs: chart_components.share_views(inputs['df'], 'MEASURE', 'GHS Gas Type', "Show all contributors to GHS Emissions"), False),
+    'chart_components.trend_views': (
+        lambda inputs: chart_components.trend_views(inputs['df'], 'REF_AREA', 'MEASURE', 'GHS Gas Type'), False),
+    'chart_components.animated_hor_bar': (
+        lambda inputs: chart_components.animated_hor_bar(inputs['df'], 'MEASURE'), False),
+    'chart_components.static_bubble': (
+        lambda inputs: chart_components.static_bubble(inputs['df_view'], DEFAULT_ENV_FACTOR), False),
+    'chart_components.animated_bubble': (
+        lambda inputs: chart_components.animated_bubble(inputs['df_view'], DEFAULT_ENV_FACTOR), False),
+    'chart_components.water_fall': (
+        lambda inputs: chart_components.water_fall(panel.indicator_long(inputs['df_view'], DEFAULT_ENV_FACTOR), 'REF_AREA', 'MEASURE', DEFAULT_ENV_FACTOR), False),
+}
+
+def _time_call(func, inputs: dict, measure_memory: bool) -> tuple[float, int | None]:
+    """Run one call and return (elapsed seconds, peak traced bytes or None)"""
+    if measure_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        func(inputs)
+    finally:
+        elapsed = time.perf_counter() - start
+        peak = None
+        if measure_memory:
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+    return elapsed, peak
+
+def run_benchmarks(scales: list[int], repeat: int, name_filter: str | None, max_seconds: float,
+                   measure_memory: bool, seed: int) -> dict:
+    """Run every selected benchmark at every scale and return the machine-readable report"""
+    pattern = re.compile(name_filter) if name_filter else None
+    selected = {name: case for name, case in BENCHMARKS.items() if pattern is None or pattern.search(name)}
+
+    base_df = data_loader.load_dataframe_for_subtopic('Greenhouse Gas')[DEFAULT_SUBTOPIC]
+    base_env = data_loader.load_dataframe_for_interested_correlational_env_indicator(DEFAULT_ENV_FACTOR)
+
+    results = []
+    # Benchmarks that blew the time budget are not retried at larger scales
+    over_budget: dict[str, int] = {}
+    for scale in sorted(scales):
+        df = scale_dataset(base_df, scale, seed)
+        df_env = scale_dataset(base_env, scale, seed)
+        inputs = {'df': df, 'df_view': panel_view(df, df_env), 'config': full_config(df)}
+        print(f"scale {scale}x: {len(df):,} rows", file=sys.stderr)
+        for name, (func, real_only) in selected.items():
+            if real_only and scale != 1:
+                continue
+            record = {'benchmark': name, 'scale': scale, 'rows': len(df), 'status': 'ok', 'runs_s': [], 'peak_bytes': None}
+            if name in over_budget:
+                record['status'] = 'skipped'
+                record['error'] = f"exceeded {max_seconds}s budget at scale {over_budget[name]}x"
+                results.append(record)
+                continue
+            for _ in range(repeat):
+                try:
+                    elapsed, peak = _time_call(func, inputs, measure_memory)
+                except Exception as e:
+                    record['status'] = 'error'
+                    record['error'] = f"{type(e).__name__}: {e}"
+                    break
+                record['runs_s'].append(elapsed)
+                if peak is not None:
+                    record['peak_bytes'] = max(peak, record['peak_bytes'] or 0)
+                if elapsed > max_seconds:
+                    over_budget[name] = scale
+                    break
+            if record['runs_s']:
+                record['median_s'] = statistics.median(record['runs_s'])
+                record['min_s'] = min(record['runs_s'])
+            print(f"  {name:<75} {record.get('median_s', float('nan')):>10.4f}s  {record['status']}", file=sys.stderr)
+            results.append(record)
+
+    return {
+        'meta': {
+            'created': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'numpy': np.__version__,
+            'plotly': plotly.__version__,
+            'streamlit': st.__version__,
+            'machine': platform.machine(),
+            'repeat': repeat,
+            'seed': seed,
+        },
+        'results': results,
+    }
+
+# ============================================================================
+# BASELINE COMPARISON
+# ============================================================================
+def compare_reports(baseline: dict, current: dict, threshold: float, min_delta: float) -> list[dict]:
+    """Pair up results by (benchmark, scale) and flag the ones that got slower than the threshold allows"""
+    baseline_index = {(r['benchmark'], r['scale']): r for r in baseline['results']}
+    rows = []
+    for record in current['results']:
+        previous = baseline_index.get((record['benchmark'], record['scale']))
+        row = {'benchmark': record['benchmark'], 'scale': record['scale'],
+               'baseline_s': None, 'current_s': record.get('median_s'), 'ratio': None, 'verdict': 'new'}
+        if previous is not None:
+            row['baseline_s'] = previous.get('median_s')
+            if record['status'] != 'ok' and previous['status'] == 'ok':
+                row['verdict'] = 'regression'
+            elif row['baseline_s'] and row['current_s'] is not None:
+                row['ratio'] = row['current_s'] / row['baseline_s']
+                delta = row['current_s'] - row['baseline_s']
+                if row['ratio'] > 1 + threshold and delta > min_delta:
+                    row['verdict'] = 'regression'
+                elif row['ratio'] < 1 - threshold and -delta > min_delta:
+                    row['verdict'] = 'improvement'
+                else:
+                    row['verdict'] = 'unchanged'
+            else:
+                row['verdict'] = record['status']
+        rows.append(row)
+    return rows
+
+def _format_seconds(value: float | None) -> str:
+    return f"{value:.4f}" if value is not None else "-"
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for the OECD Dashboard chart builders")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = subparsers.add_parser('run', help="Run the benchmark suite")
+    run_parser.add_argument('--scales', type=int, nargs='+', default=DEFAULT_SCALES, help="Row scale factors (1 = real data)")
+    run_parser.add_argument('--repeat', type=int, default=3, help="Timed runs per benchmark and scale")
+    run_parser.add_argument('--filter', default=None, help="Regular expression selecting benchmark names")
+    run_parser.add_argument('--max-seconds', type=float, default=60.0, help="Skip larger scales once a single run exceeds this")
+    run_parser.add_argument('--memory', action='store_true', help="Also record peak allocations with tracemalloc (slower)")
+    run_parser.add_argument('--seed', type=int, default=0)
+    run_parser.add_argument('--output', type=Path, default=None, help="Write the JSON report here instead of stdout")
+
+    compare_parser = subparsers.add_parser('compare', help="Compare a report against a saved baseline")
+    compare_parser.add_argument('baseline', type=Path)
+    compare_parser.add_argument('current', type=Path)
+    compare_parser.add_argument('--threshold', type=float, default=0.25, help="Allowed relative slowdown (0.25 = 25%%)")
+    compare_parser.add_argument('--min-delta', type=float, default=0.002, help="Ignore differences below this many seconds")
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'run':
+        report = run_benchmarks(args.scales, args.repeat, args.filter, args.max_seconds, args.memory, args.seed)
+        text = json.dumps(report, indent=2)
+        if args.output:
+            args.output.write_text(text)
+        else:
+            print(text)
+        return 0
+
+    baseline = json.loads(args.baseline.read_text())
+    current = json.loads(args.current.read_text())
+    rows = compare_reports(baseline, current, args.threshold, args.min_delta)
+    print(f"{'benchmark':<75} {'scale':>6} {'baseline':>10} {'current':>10} {'ratio':>7}  verdict")
+    for row in rows:
+        ratio = f"{row['ratio']:.2f}" if row['ratio'] is not None else "-"
+        print(f"{row['benchmark']:<75} {row['scale']:>6} {_format_seconds(row['baseline_s']):>10} "
+              f"{_format_seconds(row['current_s']):>10} {ratio:>7}  {row['verdict']}")
+    regressions = [row for row in rows if row['verdict'] == 'regression']
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) against {args.baseline}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+"""
+Snapshot Builder
+Pre-renders the default view of every greenhouse gas subtopic and environmental factor to figure JSON next to the
+data (DataSource/snapshots). Snapshots are keyed by the chart code version and a hash of every input, so the
+dashboard's cached_chart serves them only for identical inputs and a data or code change simply misses.
+
+Usage:
+    python Tools/build_snapshots.py
+    python Tools/build_snapshots.py --workers 8 --popular --output-dir /srv/oecd/snapshots
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Make the dashboard modules importable the same way main.py does
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path[:0] = [str(ROOT_DIR), str(ROOT_DIR / 'Pages')]
+
+from streamlit import logger as streamlit_logger
+
+from Component import chart_components
+from Component.data_loader import load_catalog
+from Component.snapshots import SNAPSHOT_DIR, MANIFEST_NAME, CHART_CODE_VERSION, snapshot_key
+from Component.warmup import DEFAULT_CONFIG, default_figure_jobs, load_popular_configs
+
+# Streamlit warns about the missing runtime on every call when used outside `streamlit run`
+streamlit_logger.set_log_level(logging.ERROR)
+
+# ============================================================================
+# JOBS
+# ============================================================================
+def snapshot_configs(include_popular: bool) -> list[dict]:
+    """The default view of every subtopic with every environmental factor (plus the popular configurations)"""
+    catalog = load_catalog()
+    configs = [
+        {**DEFAULT_CONFIG, 'name': f"{subtopic} / {factor}", 'subtopic': subtopic, 'env_factor': factor}
+        for subtopic in catalog['Greenhouse Gas']
+        for factor in catalog['Environmental Factors']
+    ]
+    if include_popular:
+        configs += load_popular_configs()
+    return configs
+
+def collect_jobs(configs: list[dict]) -> dict[str, dict]:
+    """Figures of every configuration, deduplicated by snapshot key (e.g. the map does not depend on the factor)"""
+    jobs = {}
+    for config in configs:
+        for builder, args in default_figure_jobs(config):
+            key = snapshot_key(builder.__name__, args)
+            jobs.setdefault(key, {'builder': builder.__name__, 'args': args, 'config': config['name']})
+    return jobs
+
+def _render(key: str, builder_name: str, args: tuple, output_dir: Path) -> tuple[str, float, int]:
+    """Build one figure (in a worker process) and write its JSON; returns (key, seconds, bytes)"""
+    start = time.perf_counter()
+    text = getattr(chart_components, builder_name)(*args).to_json()
+    (output_dir / f"{key}.json").write_text(text, encoding='utf-8')
+    return key, time.perf_counter() - start, len(text)
+
+# ============================================================================
+# BUILD
+# ============================================================================
+def build_snapshots(output_dir: Path, workers: int, include_popular: bool) -> int:
+    """Render every job on a process pool, write the manifest and drop snapshots of earlier builds"""
+    output_dir.mkdir(parents=True, exist_ok=True)
+    jobs = collect_jobs(snapshot_configs(include_popular))
+    print(f"{len(jobs)} figures to render with {workers} worker processes", file=sys.stderr)
+
+    snapshots, failures = {}, 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(_render, key, job['builder'], job['args'], output_dir): key
+            for key, job in jobs.items()
+        }
+        for future in as_completed(futures):
+            key = futures[future]
+            job = jobs[key]
+            try:
+                _, seconds, size = future.result()
+            except Exception as e:
+                failures += 1
+                print(f"FAILED {job['builder']} ({job['config']}): {e!r}", file=sys.stderr)
+                continue
+            snapshots[key] = {'file': f"{key}.json", 'builder': job['builder'], 'config': job['config'],
+                              'bytes': size, 'build_s': round(seconds, 3)}
+            print(f"{job['builder']:<18} {seconds:7.2f}s  {job['config']}", file=sys.stderr)
+
+    manifest = {
+        'chart_code_version': CHART_CODE_VERSION,
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'snapshots': snapshots,
+    }
+    # Replace the manifest atomically: running dashboards may be reading it
+    manifest_tmp = output_dir / f"{MANIFEST_NAME}.tmp"
+    manifest_tmp.write_text(json.dumps(manifest, indent=2), encoding='utf-8')
+    os.replace(manifest_tmp, output_dir / MANIFEST_NAME)
+
+    stale = [path for path in output_dir.glob('*.json') if path.name != MANIFEST_NAME and path.stem not in snapshots]
+    for path in stale:
+        path.unlink()
+    print(f"{len(snapshots)} snapshots written to {output_dir}, {len(stale)} stale removed, {failures} failed",
+          file=sys.stderr)
+    return 1 if failures else 0
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Pre-render default dashboard figures to JSON snapshots")
+    parser.add_argument('--output-dir', type=Path, default=SNAPSHOT_DIR,
+                        help="Where to write the snapshots (the dashboard reads OECD_DASHBOARD_SNAPSHOT_DIR)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="Worker processes")
+    parser.add_argument('--popular', action='store_true',
+                        help="Also render the configurations of the warm-up's popular configs file")
+    args = parser.parse_args(argv)
+    return build_snapshots(args.output_dir, args.workers, args.popular)
+
+if __name__ == "__main__":
+    sys.exit(main())
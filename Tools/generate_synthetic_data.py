@@ -0,0 +1,264 @@
+"""
+Synthetic Data Generator
+Streams OECD-schema CSV files (REF_AREA, MEASURE, UNIT_MEASURE, TIME_PERIOD, OBS_VALUE, UNIT_MULT)
+of arbitrary size to disk for load and scale testing, and registers them in a data catalog.
+
+Rows are generated chunk by chunk from a flat row index, and every value is a pure function of
+(seed, series, period), so memory stays constant and the output is identical for any chunk size.
+
+Usage:
+    python Tools/generate_synthetic_data.py --kind ghs --countries 500 --measures 40 \\
+        --start-year 1950 --end-year 2023 --name "Synthetic GHS" --output-dir /tmp/oecd_synthetic
+    OECD_DASHBOARD_CATALOG=/tmp/oecd_synthetic/catalog.json streamlit run main.py
+
+    Quarterly (--frequency Q) and monthly (--frequency M) files are for loader and filter benchmarks only: the
+    dashboard pages expect annual TIME_PERIOD values.
+"""
+
+import argparse
+import csv
+import itertools
+import json
+import string
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_CATALOG = ROOT_DIR / 'DataSource' / 'catalog.json'
+
+COLUMNS = ['REF_AREA', 'MEASURE', 'UNIT_MEASURE', 'TIME_PERIOD', 'OBS_VALUE', 'UNIT_MULT']
+
+# Real OECD / partner codes first so maps still draw the first countries
+OECD_COUNTRIES = [
+    'ARG', 'AUS', 'AUT', 'BEL', 'BGR', 'BRA', 'CAN', 'CHE', 'CHL', 'CHN', 'COL', 'CRI', 'CYP', 'CZE', 'DEU',
+    'DNK', 'ESP', 'EST', 'FIN', 'FRA', 'GBR', 'GRC', 'HRV', 'HUN', 'IDN', 'IND', 'IRL', 'ISL', 'ISR', 'ITA',
+    'JPN', 'KAZ', 'KOR', 'LTU', 'LUX', 'LVA', 'MEX', 'MLT', 'NLD', 'NOR', 'NZL', 'PER', 'PHL', 'POL', 'PRT',
+    'ROU', 'RUS', 'SAU', 'SVK', 'SVN', 'SWE', 'TUR', 'UKR', 'USA', 'VNM', 'ZAF',
+]
+
+# Each kind mirrors one DataSource file: measure codes, unit, unit multiplier, and the value distribution.
+# `log_mean`/`log_sigma` parametrise the log-normal level of a series, `negative_share` is the share of
+# series that are net absorptions (negative), keyed by measure suffix.
+KIND_PROFILES = {
+    'ghs': {
+        'measures': ['CH4', 'CO2', 'HFC', 'N2O', 'PFC', 'SF'],
+        'unit': 'T_CO2E', 'unit_mult': 3, 'log_mean': 22.0, 'log_sigma': 2.0, 'negative_share': {},
+        'catalog_topic': 'Greenhouse Gas',
+    },
+    'lulucf': {
+        'measures': ['CH4_LULUCF', 'CO2_LULUCF', 'N2O_LULUCF'],
+        'unit': 'T_CO2E', 'unit_mult': 3, 'log_mean': 21.0, 'log_sigma': 2.2,
+        # Forests and other land absorb CO2 in most countries
+        'negative_share': {'CO2_LULUCF': 0.8},
+        'catalog_topic': 'Greenhouse Gas',
+    },
+    'sector': {
+        'measures': ['TR', 'IPP', 'EI', 'AGR', 'OTH_SECTOR', 'MIC', 'WASTE', 'OTH'],
+        'unit': 'T_CO2E', 'unit_mult': 3, 'log_mean': 22.5, 'log_sigma': 2.0, 'negative_share': {},
+        'catalog_topic': 'Greenhouse Gas',
+    },
+    'nature': {
+        'measures': ['SETT_CO2', 'CL_CH4', 'CL_CO2', 'OT_N2O', 'GL_N2O', 'GL_CO2', 'GL_CH4', 'F_N2O', 'WET_N2O',
+                     'HWP_CO2', 'F_CH4', 'F_CO2', 'SETT_N2O', 'SETT_CH4', 'CL_N2O', 'WET_CH4', 'OTHER_CO2',
+                     'OTHER_N2O', 'OT_CO2', 'OTHER_CH4', 'OT_CH4', 'WET_CO2'],
+        'unit': 'T_CO2E', 'unit_mult': 3, 'log_mean': 19.0, 'log_sigma': 2.5,
+        'negative_share': {'F_CO2': 0.85, 'GL_CO2': 0.4, 'CL_CO2': 0.3, 'HWP_CO2': 0.6},
+        'catalog_topic': 'Greenhouse Gas',
+    },
+    'energy': {
+        'measures': ['TOTNRJAG'], 'unit': 'TOE', 'unit_mult': 3, 'log_mean': 21.0, 'log_sigma': 1.5,
+        'negative_share': {}, 'catalog_topic': 'Environmental Factors',
+    },
+    'land': {
+        'measures': ['TOTAGR_LAND'], 'unit': 'HA', 'unit_mult': 3, 'log_mean': 22.0, 'log_sigma': 1.8,
+        'negative_share': {}, 'catalog_topic': 'Environmental Factors',
+    },
+    'water': {
+        'measures': ['TOTFRESHAG'], 'unit': 'M3', 'unit_mult': 6, 'log_mean': 20.0, 'log_sigma': 2.0,
+        'negative_share': {}, 'catalog_topic': 'Environmental Factors',
+    },
+    'population': {
+        'measures': ['POP'], 'unit': 'PS', 'unit_mult': 0, 'log_mean': 16.0, 'log_sigma': 1.3,
+        'negative_share': {}, 'catalog_topic': 'Population',
+    },
+}
+
+PERIODS_PER_YEAR = {'A': 1, 'Q': 4, 'M': 12}
+
+# ============================================================================
+# DETERMINISTIC RANDOMNESS
+# ============================================================================
+def _mix64(values: np.ndarray) -> np.ndarray:
+    """SplitMix64 finaliser: maps integers to well-spread 64-bit hashes (vectorised)"""
+    z = values.astype(np.uint64) + np.uint64(0x9E3779B97F4A7C15)
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+def _uniform(keys: np.ndarray, seed: int, stream: int) -> np.ndarray:
+    """Uniform(0, 1) draws that only depend on (seed, stream, key), never on chunking"""
+    salted = keys.astype(np.uint64) * np.uint64(1_000_003) + np.uint64((seed * 7919 + stream) & 0xFFFFFFFF)
+    return ((_mix64(salted) >> np.uint64(11)).astype(np.float64) + 0.5) / float(1 << 53)
+
+def _normal(keys: np.ndarray, seed: int, stream: int) -> np.ndarray:
+    """Standard normal draws via Box-Muller over two independent uniform streams"""
+    u1 = _uniform(keys, seed, stream)
+    u2 = _uniform(keys, seed, stream + 1)
+    return np.sqrt(-2.0 * np.log(u1)) * np.cos(2.0 * np.pi * u2)
+
+# ============================================================================
+# DIMENSIONS
+# ============================================================================
+def country_codes(count: int) -> list[str]:
+    """Real country codes first, then synthetic three-letter codes that do not clash with them"""
+    codes = OECD_COUNTRIES[:count]
+    if count > len(codes):
+        existing = set(codes)
+        synthetic = (''.join(letters) for letters in itertools.product(string.ascii_uppercase, repeat=3))
+        # Prefix with X so synthetic areas are easy to spot next to real ISO-3 codes
+        synthetic = (code for code in synthetic if code.startswith('X') and code not in existing)
+        codes += list(itertools.islice(synthetic, count - len(codes)))
+        if len(codes) < count:
+            raise ValueError(f"At most {len(codes)} distinct countries can be generated")
+    return codes
+
+def measure_codes(kind: str, count: int | None) -> list[str]:
+    """The kind's real measure codes, extended with numbered variants when more measures are requested"""
+    base = KIND_PROFILES[kind]['measures']
+    if count is None or count <= len(base):
+        return base[:count] if count else list(base)
+    extra = [f"{code}_{i}" for i in range(1, count) for code in base]
+    return base + extra[:count - len(base)]
+
+def period_labels(start_year: int, end_year: int, frequency: str) -> list:
+    """SDMX-style TIME_PERIOD labels: 2021 (annual), 2021-Q1 (quarterly) or 2021-01 (monthly)"""
+    if frequency == 'A':
+        return list(range(start_year, end_year + 1))
+    if frequency == 'Q':
+        return [f"{year}-Q{quarter}" for year in range(start_year, end_year + 1) for quarter in range(1, 5)]
+    return [f"{year}-{month:02d}" for year in range(start_year, end_year + 1) for month in range(1, 13)]
+
+# ============================================================================
+# GENERATION
+# ============================================================================
+def generate_chunks(kind: str, countries: list[str], measures: list[str], periods: list, frequency: str,
+                    seed: int, chunk_rows: int):
+    """Yield DataFrames of at most `chunk_rows` rows covering every (country, measure, period)"""
+    profile = KIND_PROFILES[kind]
+    n_measures = len(measures)
+    n_periods = len(periods)
+    total_rows = len(countries) * n_measures * n_periods
+    periods_per_year = PERIODS_PER_YEAR[frequency]
+
+    country_array = np.array(countries, dtype=object)
+    measure_array = np.array(measures, dtype=object)
+    period_array = np.array(periods, dtype=object)
+    # Share of negative series per measure (numbered variants inherit from their base code)
+    shares = profile['negative_share']
+    negative_share = np.array([
+        shares.get(code if code in shares else code.rsplit('_', 1)[0], 0.0) for code in measures
+    ])
+    # Seasonal profile for sub-annual data: a summer/winter swing of up to +-25%
+    season_phase = 2.0 * np.pi * (np.arange(n_periods) % periods_per_year) / periods_per_year
+
+    for start in range(0, total_rows, chunk_rows):
+        row = np.arange(start, min(start + chunk_rows, total_rows), dtype=np.int64)
+        series, period_idx = np.divmod(row, n_periods)
+        country_idx, measure_idx = np.divmod(series, n_measures)
+
+        # Per-series level, growth and seasonality amplitude
+        level = np.exp(profile['log_mean'] + profile['log_sigma'] * _normal(series, seed, 0))
+        growth = 0.02 * _normal(series, seed, 2)
+        amplitude = 0.25 * _uniform(series, seed, 3) if periods_per_year > 1 else 0.0
+        sign = np.where(_uniform(series, seed, 4) < negative_share[measure_idx], -1.0, 1.0)
+        # Per-observation noise
+        noise = 1.0 + 0.05 * _normal(row, seed, 5)
+
+        years_elapsed = period_idx / periods_per_year
+        values = sign * level * np.exp(growth * years_elapsed) * (1.0 + amplitude * np.sin(season_phase[period_idx])) * noise
+        # Sub-annual observations are shares of the annual total
+        values = values / periods_per_year
+
+        yield pd.DataFrame({
+            'REF_AREA': country_array[country_idx],
+            'MEASURE': measure_array[measure_idx],
+            'UNIT_MEASURE': profile['unit'],
+            'TIME_PERIOD': period_array[period_idx],
+            'OBS_VALUE': np.round(values, 3),
+            'UNIT_MULT': profile['unit_mult'],
+        })
+
+def write_dataset(output_file: Path, chunks) -> int:
+    """Stream the chunks into one CSV file and return the number of data rows written"""
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    rows_written = 0
+    with open(output_file, 'w', newline='', encoding='utf-8') as f:
+        csv.writer(f).writerow(COLUMNS)
+        for chunk in chunks:
+            chunk.to_csv(f, header=False, index=False)
+            rows_written += len(chunk)
+    return rows_written
+
+def register_in_catalog(catalog_file: Path, topic: str, name: str, dataset_file: Path):
+    """Add (or replace) the dataset entry, seeding a new catalog with the real datasets"""
+    if catalog_file.exists():
+        catalog = json.loads(catalog_file.read_text(encoding='utf-8'))
+    else:
+        # A fresh catalog keeps every real dataset reachable, with paths made absolute
+        source = json.loads(DEFAULT_CATALOG.read_text(encoding='utf-8'))
+        catalog = {
+            section: {entry: str((DEFAULT_CATALOG.parent / path).resolve()) for entry, path in entries.items()}
+            for section, entries in source.items()
+        }
+    try:
+        entry_path = str(dataset_file.resolve().relative_to(catalog_file.resolve().parent))
+    except ValueError:
+        entry_path = str(dataset_file.resolve())
+    catalog.setdefault(topic, {})[name] = entry_path
+    catalog_file.parent.mkdir(parents=True, exist_ok=True)
+    catalog_file.write_text(json.dumps(catalog, indent=4), encoding='utf-8')
+    return entry_path
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Generate OECD-schema datasets for load and scale testing")
+    parser.add_argument('--kind', choices=sorted(KIND_PROFILES), default='ghs', help="Which DataSource file to imitate")
+    parser.add_argument('--countries', type=int, default=200)
+    parser.add_argument('--measures', type=int, default=None, help="Defaults to the kind's real measure codes")
+    parser.add_argument('--start-year', type=int, default=1990)
+    parser.add_argument('--end-year', type=int, default=2023)
+    parser.add_argument('--frequency', choices=sorted(PERIODS_PER_YEAR), default='A', help="A(nnual), Q(uarterly) or M(onthly)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--chunk-rows', type=int, default=250_000, help="Rows generated and written per chunk")
+    parser.add_argument('--output-dir', type=Path, default=Path('synthetic_data'))
+    parser.add_argument('--name', default=None, help="Catalog entry name (defaults to 'Synthetic <kind>')")
+    parser.add_argument('--catalog', type=Path, default=None, help="Catalog to update (defaults to <output-dir>/catalog.json)")
+    args = parser.parse_args(argv)
+
+    if args.end_year < args.start_year:
+        parser.error("--end-year must not be before --start-year")
+
+    countries = country_codes(args.countries)
+    measures = measure_codes(args.kind, args.measures)
+    periods = period_labels(args.start_year, args.end_year, args.frequency)
+    name = args.name or f"Synthetic {args.kind}"
+    file_stem = ''.join(ch if ch.isalnum() else '_' for ch in name)
+    output_file = args.output_dir / f"{file_stem}.csv"
+
+    total_rows = len(countries) * len(measures) * len(periods)
+    print(f"Writing {total_rows:,} rows ({len(countries)} countries x {len(measures)} measures x "
+          f"{len(periods)} periods) to {output_file}", file=sys.stderr)
+    chunks = generate_chunks(args.kind, countries, measures, periods, args.frequency, args.seed, args.chunk_rows)
+    rows_written = write_dataset(output_file, chunks)
+
+    catalog_file = args.catalog or args.output_dir / 'catalog.json'
+    topic = KIND_PROFILES[args.kind]['catalog_topic']
+    entry_path = register_in_catalog(catalog_file, topic, name, output_file)
+    print(json.dumps({'catalog': str(catalog_file), 'topic': topic, 'name': name, 'path': entry_path,
+                      'rows': rows_written, 'seed': args.seed, 'frequency': args.frequency}, indent=2))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,361 @@
+"""
+Load Test
+Runs many concurrent headless sessions against a local dashboard server over Streamlit's websocket protocol. Each
+session replays an analyst-like script (subtopic changes, year slider drags, toggles, "Select All") with think time,
+and the tool reports throughput, rerun latency percentiles and the server's CPU and memory under load.
+
+Usage:
+    python Tools/load_test.py --sessions 20 --duration 120 --output load.json
+    python Tools/load_test.py --url ws://localhost:8501 --pid 12345 --sessions 50 --ramp-up 30
+    python Tools/load_test.py --sessions 10 --fail-p95 2.0    # exits 1 when any interaction p95 is above 2 s
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from datetime import datetime, timezone
+from pathlib import Path
+
+import websockets
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+DASHBOARD_PAGE = "📈 Dashboard"
+# Sections that only render once opened (see Pages/2_dashboard.py)
+DEFERRED_SECTIONS = ['analytical_view_expander', 'correlation_stats_expander', 'correlation_view_expander', 'environmental_breakdown_expander']
+
+# ============================================================================
+# SESSION CLIENT
+# ============================================================================
+def _widget_key(widget_id: str) -> str:
+    """Widget ids end with the user key ("None" for widgets without one)"""
+    return widget_id.rsplit('-', 1)[-1]
+
+def _initial_state(kind: str, proto) -> WidgetState | None:
+    """Value the browser would send for a freshly rendered widget (None for buttons and unknown widgets)"""
+    state = WidgetState(id=proto.id)
+    if kind == 'checkbox':
+        state.bool_value = proto.value if proto.set_value else proto.default
+    elif kind == 'selectbox':
+        state.string_value = proto.raw_value if proto.set_value else proto.options[proto.default]
+    elif kind == 'multiselect':
+        values = proto.raw_values if proto.set_value else [proto.options[i] for i in proto.default]
+        state.string_array_value.data.extend(values)
+    elif kind == 'slider' and proto.options:
+        values = proto.raw_value if proto.set_value else [proto.options[int(i)] for i in proto.default]
+        state.string_array_value.data.extend(values)
+    elif kind == 'slider':
+        state.double_array_value.data.extend(proto.value if proto.set_value else proto.default)
+    elif kind == 'expandable':
+        state.bool_value = proto.expanded
+    else:
+        return None
+    return state
+
+class DashboardSession:
+    """One simulated browser tab: keeps the widget states and replays reruns like the frontend does"""
+
+    def __init__(self, ws):
+        self.ws = ws
+        self.widgets = {}   # key -> {'kind', 'proto', 'fragment_id'}
+        self.states = {}    # widget id -> WidgetState sent with every rerun
+        self.errors = []
+
+    async def rerun(self, fragment_id: str = '', triggers: tuple[WidgetState, ...] = ()) -> float:
+        """Send a rerun request and wait for the script to finish; returns the wall time in seconds"""
+        message = BackMsg()
+        message.rerun_script.query_string = ''
+        message.rerun_script.widget_states.widgets.extend(list(self.states.values()) + list(triggers))
+        if fragment_id:
+            message.rerun_script.fragment_id = fragment_id
+        start = time.perf_counter()
+        await self.ws.send(message.SerializeToString())
+        seen = {}
+        while True:
+            forward = ForwardMsg()
+            forward.ParseFromString(await self.ws.recv())
+            kind = forward.WhichOneof('type')
+            if kind == 'delta':
+                self._record(forward.delta, seen)
+            elif kind == 'script_finished':
+                elapsed = time.perf_counter() - start
+                break
+        self._merge(seen, full_run=not fragment_id)
+        return elapsed
+
+    def _record(self, delta, seen: dict):
+        """Collect the widgets (and app exceptions) of one delta"""
+        if delta.WhichOneof('type') == 'new_element':
+            element = delta.new_element
+            kind = element.WhichOneof('type')
+            proto = getattr(element, kind)
+            if kind == 'exception':
+                self.errors.append(proto.message)
+            elif getattr(proto, 'id', ''):
+                seen[_widget_key(proto.id)] = {'kind': kind, 'proto': proto, 'fragment_id': delta.fragment_id}
+        elif delta.WhichOneof('type') == 'add_block' and delta.add_block.WhichOneof('type') == 'expandable':
+            block = delta.add_block
+            if block.id:
+                seen[_widget_key(block.id)] = {'kind': 'expandable', 'proto': block.expandable,
+                                               'fragment_id': delta.fragment_id, 'id': block.id}
+
+    def _merge(self, seen: dict, full_run: bool):
+        """Keep client-side values of widgets that are still there, initialise new ones, drop vanished ones"""
+        if full_run:
+            self.widgets = {}
+        for key, widget in seen.items():
+            widget_id = widget.get('id') or widget['proto'].id
+            widget['id'] = widget_id
+            self.widgets[key] = widget
+            if widget_id not in self.states or getattr(widget['proto'], 'set_value', False):
+                state = _initial_state(widget['kind'], widget['proto'])
+                if state is not None:
+                    state.id = widget_id
+                    self.states[widget_id] = state
+        live_ids = {widget['id'] for widget in self.widgets.values()}
+        self.states = {widget_id: state for widget_id, state in self.states.items() if widget_id in live_ids}
+
+    def widget(self, key: str) -> dict:
+        """Widget by user key (KeyError when it is not on the page)"""
+        return self.widgets[key]
+
+# ============================================================================
+# INTERACTION SCRIPT
+# ============================================================================
+# Each step changes one widget like a user would and returns the fragment to rerun ('' for the whole page)
+def _flip_toggle(key: str):
+    def step(session: DashboardSession, rng: random.Random):
+        widget = session.widget(key)
+        state = session.states[widget['id']]
+        state.bool_value = not state.bool_value
+        return widget['fragment_id'], ()
+    return step
+
+def _change_subtopic(session: DashboardSession, rng: random.Random):
+    widget = session.widget('subtopic_select')
+    state = session.states[widget['id']]
+    state.string_value = rng.choice([option for option in widget['proto'].options if option != state.string_value])
+    return widget['fragment_id'], ()
+
+def _drag_year_slider(session: DashboardSession, rng: random.Random):
+    widget = session.widget('year_range_slider')
+    options = list(widget['proto'].options)
+    start, end = sorted(rng.sample(range(len(options)), 2))
+    state = session.states[widget['id']]
+    del state.string_array_value.data[:]
+    state.string_array_value.data.extend([options[start], options[end]])
+    return widget['fragment_id'], ()
+
+def _press(key: str):
+    def step(session: DashboardSession, rng: random.Random):
+        widget = session.widget(key)
+        return widget['fragment_id'], (WidgetState(id=widget['id'], trigger_value=True),)
+    return step
+
+# Relative weights: analysts mostly drag the slider and flip chart toggles, and change subtopics now and then
+SCRIPT = {
+    'year_slider': (_drag_year_slider, 4),
+    'toggle_button_1': (_flip_toggle('toggle_button_1'), 2),
+    'toggle_button_2': (_flip_toggle('toggle_button_2'), 2),
+    'accumulated_ghs_toggle': (_flip_toggle('accumulated_ghs_toggle'), 2),
+    'accumulated_env_toggle': (_flip_toggle('accumulated_env_toggle'), 1),
+    'subtopic_change': (_change_subtopic, 2),
+    'select_all_countries': (_press('select_all_countries'), 1),
+    'select_all_measures': (_press('select_all_measures'), 1),
+}
+
+async def run_session(url: str, deadline: float, think: float, rng: random.Random, samples: list[dict]):
+    """Open the dashboard, open its deferred sections, then replay the script until the deadline"""
+    def record(interaction: str, seconds: float):
+        samples.append({'interaction': interaction, 'seconds': seconds, 'finished': time.time()})
+
+    async with websockets.connect(f"{url}/_stcore/stream", subprotocols=['streamlit'], max_size=None) as ws:
+        session = DashboardSession(ws)
+        record('connect', await session.rerun())
+        page = session.widget('None')  # the page selector of main.py has no key
+        session.states[page['id']].string_value = DASHBOARD_PAGE
+        record('open_dashboard', await session.rerun())
+        for key in DEFERRED_SECTIONS:
+            if key in session.widgets:
+                session.states[session.widgets[key]['id']].bool_value = True
+        record('open_sections', await session.rerun())
+
+        names = list(SCRIPT)
+        weights = [SCRIPT[name][1] for name in names]
+        while time.time() < deadline:
+            await asyncio.sleep(rng.expovariate(1 / think) if think > 0 else 0)
+            name = rng.choices(names, weights)[0]
+            try:
+                fragment_id, triggers = SCRIPT[name][0](session, rng)
+            except KeyError:
+                continue
+            record(name, await session.rerun(fragment_id, triggers))
+        return session.errors
+
+# ============================================================================
+# SERVER AND RESOURCE SAMPLING
+# ============================================================================
+def start_server(port: int) -> subprocess.Popen:
+    """Start `streamlit run main.py` headless and wait until its health endpoint answers"""
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'streamlit', 'run', str(ROOT_DIR / 'main.py'), '--server.headless', 'true',
+         '--server.port', str(port), '--browser.gatherUsageStats', 'false', '--server.fileWatcherType', 'none'],
+        cwd=ROOT_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    for _ in range(120):
+        try:
+            with urllib.request.urlopen(f"http://localhost:{port}/_stcore/health", timeout=1):
+                return server
+        except OSError:
+            time.sleep(0.5)
+    server.terminate()
+    raise RuntimeError("The dashboard server did not become healthy within 60 s")
+
+def _read_proc(pid: int) -> tuple[float, int]:
+    """(CPU seconds used so far, resident bytes) of a process, from /proc (Linux)"""
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rsplit(')', 1)[1].split()
+    cpu_seconds = (int(fields[11]) + int(fields[12])) / os.sysconf('SC_CLK_TCK')
+    with open(f"/proc/{pid}/statm") as f:
+        rss_bytes = int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    return cpu_seconds, rss_bytes
+
+async def sample_resources(pid: int, interval: float, stop: asyncio.Event, samples: list[dict]):
+    """Record the server's CPU use (% of one core) and RSS every interval until stopped"""
+    last_cpu, _ = _read_proc(pid)
+    last_time = time.perf_counter()
+    while not stop.is_set():
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=interval)
+        except asyncio.TimeoutError:
+            pass
+        cpu, rss = _read_proc(pid)
+        now = time.perf_counter()
+        samples.append({'cpu_percent': 100 * (cpu - last_cpu) / (now - last_time), 'rss_mib': rss / 2**20})
+        last_cpu, last_time = cpu, now
+
+# ============================================================================
+# REPORT
+# ============================================================================
+def _percentile(values: list[float], percent: float) -> float:
+    """Linear-interpolated percentile of a non-empty list"""
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * percent / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+def summarise(samples: list[dict], resources: list[dict], measured_seconds: float) -> dict:
+    """Throughput, latency percentiles per interaction and server resource statistics"""
+    interactions = {}
+    for name in dict.fromkeys(sample['interaction'] for sample in samples):
+        seconds = [sample['seconds'] for sample in samples if sample['interaction'] == name]
+        interactions[name] = {
+            'n': len(seconds),
+            'p50_s': round(_percentile(seconds, 50), 4),
+            'p95_s': round(_percentile(seconds, 95), 4),
+            'p99_s': round(_percentile(seconds, 99), 4),
+            'max_s': round(max(seconds), 4),
+        }
+    scripted = [sample for sample in samples if sample['interaction'] in SCRIPT]
+    cpu = [sample['cpu_percent'] for sample in resources]
+    rss = [sample['rss_mib'] for sample in resources]
+    return {
+        'reruns': len(scripted),
+        'throughput_rps': round(len(scripted) / measured_seconds, 3) if measured_seconds else 0.0,
+        'all_scripted': {
+            'p50_s': round(_percentile([s['seconds'] for s in scripted], 50), 4) if scripted else None,
+            'p95_s': round(_percentile([s['seconds'] for s in scripted], 95), 4) if scripted else None,
+            'p99_s': round(_percentile([s['seconds'] for s in scripted], 99), 4) if scripted else None,
+        },
+        'interactions': interactions,
+        'cpu_percent_mean': round(statistics.fmean(cpu), 1) if cpu else None,
+        'cpu_percent_max': round(max(cpu), 1) if cpu else None,
+        'rss_mib_mean': round(statistics.fmean(rss), 1) if rss else None,
+        'rss_mib_max': round(max(rss), 1) if rss else None,
+    }
+
+async def run_load_test(args) -> tuple[dict, list[dict], list[str]]:
+    """Start the sessions with a linear ramp-up and collect samples until the duration has passed"""
+    rng = random.Random(args.seed)
+    samples, resources = [], []
+    stop = asyncio.Event()
+    sampler = asyncio.create_task(sample_resources(args.pid, 1.0, stop, resources)) if args.pid else None
+    started = time.time()
+    deadline = started + args.ramp_up + args.duration
+
+    async def delayed(index: int):
+        await asyncio.sleep(args.ramp_up * index / max(args.sessions, 1))
+        return await run_session(args.url, deadline, args.think, random.Random(rng.random()), samples)
+
+    results = await asyncio.gather(*(delayed(i) for i in range(args.sessions)), return_exceptions=True)
+    stop.set()
+    if sampler:
+        await sampler
+    errors = []
+    for result in results:
+        errors += [repr(result)] if isinstance(result, BaseException) else result
+    return summarise(samples, resources, time.time() - started), samples, errors
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Load-test the dashboard with concurrent headless sessions")
+    parser.add_argument('--sessions', type=int, default=10, help="Concurrent sessions")
+    parser.add_argument('--duration', type=float, default=60.0, help="Seconds of steady load after the ramp-up")
+    parser.add_argument('--ramp-up', type=float, default=10.0, help="Seconds over which the sessions are started")
+    parser.add_argument('--think', type=float, default=2.0, help="Mean think time between interactions (seconds)")
+    parser.add_argument('--url', default=None, help="ws:// URL of a running server (default: start one locally)")
+    parser.add_argument('--port', type=int, default=8599, help="Port of the locally started server")
+    parser.add_argument('--pid', type=int, default=None, help="Server process to sample when --url is given")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', type=Path, default=None, help="Write the JSON report (summary and samples) here")
+    parser.add_argument('--fail-p95', type=float, default=None,
+                        help="Exit with status 1 when the p95 of any scripted interaction exceeds this many seconds")
+    args = parser.parse_args(argv)
+
+    server = None
+    if args.url is None:
+        server = start_server(args.port)
+        args.url, args.pid = f"ws://localhost:{args.port}", server.pid
+    try:
+        summary, samples, errors = asyncio.run(run_load_test(args))
+    finally:
+        if server:
+            server.terminate()
+            server.wait(timeout=30)
+
+    print(f"{args.sessions} sessions, {summary['reruns']} scripted reruns, {summary['throughput_rps']} reruns/s, "
+          f"server CPU {summary['cpu_percent_mean']}% mean / {summary['cpu_percent_max']}% max, "
+          f"RSS {summary['rss_mib_mean']} MiB mean / {summary['rss_mib_max']} MiB max")
+    columns = ['n', 'p50_s', 'p95_s', 'p99_s', 'max_s']
+    print('| interaction | ' + ' | '.join(columns) + ' |')
+    print('|' + '---|' * (len(columns) + 1))
+    for name, row in summary['interactions'].items():
+        print(f"| {name} | " + ' | '.join(str(row[column]) for column in columns) + ' |')
+    for error in errors[:10]:
+        print(f"app error: {error}", file=sys.stderr)
+
+    if args.output:
+        report = {
+            'meta': {'created': datetime.now(timezone.utc).isoformat(timespec='seconds'), 'sessions': args.sessions,
+                     'duration': args.duration, 'ramp_up': args.ramp_up, 'think': args.think, 'seed': args.seed},
+            'summary': summary,
+            'errors': errors,
+            'samples': samples,
+        }
+        args.output.write_text(json.dumps(report, indent=2), encoding='utf-8')
+
+    failed = args.fail_p95 is not None and any(
+        row['p95_s'] > args.fail_p95 for name, row in summary['interactions'].items() if name in SCRIPT)
+    return 1 if errors or failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
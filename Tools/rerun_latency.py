@@ -0,0 +1,183 @@
+"""
+Rerun Latency Harness
+Runs Pages/2_dashboard.py headless with Streamlit's AppTest, scripts the interactions users complain about
+(toggles, subtopic changes, year slider drags) and records wall time and peak traced memory per rerun.
+
+Usage:
+    python Tools/rerun_latency.py --repeat 10 --output latency.csv --label "$(git rev-parse --short HEAD)"
+    python Tools/rerun_latency.py --interactions toggle_button_2 year_slider --no-memory
+"""
+
+import argparse
+import csv
+import logging
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path[:0] = [str(ROOT_DIR), str(ROOT_DIR / 'Pages')]
+
+import streamlit as st
+from streamlit import logger as streamlit_logger
+from streamlit.testing.v1 import AppTest
+
+streamlit_logger.set_log_level(logging.ERROR)
+
+DASHBOARD_SCRIPT = ROOT_DIR / 'Pages' / '2_dashboard.py'
+
+# ============================================================================
+# INTERACTIONS
+# ============================================================================
+# Each interaction mutates widget state on the AppTest; the harness then times the rerun it triggers.
+def _flip_toggle(key: str):
+    def interaction(at: AppTest, rng: random.Random):
+        toggle = at.toggle(key=key)
+        toggle.set_value(not toggle.value)
+    return interaction
+
+def _change_subtopic(at: AppTest, rng: random.Random):
+    selectbox = at.selectbox(key='subtopic_select')
+    options = [option for option in selectbox.options if option != selectbox.value]
+    selectbox.set_value(rng.choice(options))
+
+def _drag_year_slider(at: AppTest, rng: random.Random):
+    slider = at.select_slider(key='year_range_slider')
+    years = sorted(int(option) for option in slider.options)
+    start, end = sorted(rng.sample(years, 2))
+    slider.set_range(start, end)
+
+# Sections that only render once opened; the harness opens them after the first paint so their widgets exist
+DEFERRED_SECTIONS = ['analytical_view_expander', 'correlation_stats_expander', 'correlation_view_expander', 'environmental_breakdown_expander']
+
+INTERACTIONS = {
+    'toggle_button_1': _flip_toggle('toggle_button_1'),
+    'toggle_button_2': _flip_toggle('toggle_button_2'),
+    'accumulated_ghs_toggle': _flip_toggle('accumulated_ghs_toggle'),
+    'accumulated_env_toggle': _flip_toggle('accumulated_env_toggle'),
+    'subtopic_change': _change_subtopic,
+    'year_slider': _drag_year_slider,
+}
+
+# ============================================================================
+# MEASUREMENT
+# ============================================================================
+def _timed_run(at: AppTest, timeout: float, measure_memory: bool) -> tuple[float, float | None]:
+    """Run the script once and return (seconds, peak MiB traced during the rerun or None)"""
+    if measure_memory:
+        tracemalloc.reset_peak()
+    start = time.perf_counter()
+    at.run(timeout=timeout)
+    elapsed = time.perf_counter() - start
+    peak_mib = tracemalloc.get_traced_memory()[1] / 2**20 if measure_memory else None
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+    return elapsed, peak_mib
+
+def collect_samples(interactions: list[str], repeat: int, timeout: float, measure_memory: bool, seed: int) -> list[dict]:
+    """Record one sample per rerun: the cold and warm page loads, opening the deferred sections, then every interaction"""
+    rng = random.Random(seed)
+    samples = []
+    if measure_memory:
+        tracemalloc.start()
+    try:
+        # Cold start pays for loading every dataset; a second session shows the cached first paint
+        st.cache_data.clear()
+        st.cache_resource.clear()
+        for name in ('cold_start', 'warm_start'):
+            at = AppTest.from_file(str(DASHBOARD_SCRIPT), default_timeout=timeout)
+            elapsed, peak = _timed_run(at, timeout, measure_memory)
+            samples.append({'interaction': name, 'iteration': 0, 'seconds': elapsed, 'peak_mib': peak})
+
+        # Opening every deferred section pays for the charts below the fold
+        for key in DEFERRED_SECTIONS:
+            at.session_state[key] = True
+        elapsed, peak = _timed_run(at, timeout, measure_memory)
+        samples.append({'interaction': 'open_sections', 'iteration': 0, 'seconds': elapsed, 'peak_mib': peak})
+
+        for name in interactions:
+            for iteration in range(repeat):
+                try:
+                    INTERACTIONS[name](at, rng)
+                except KeyError:
+                    print(f"{name}: widget not on the page, skipped", file=sys.stderr)
+                    break
+                elapsed, peak = _timed_run(at, timeout, measure_memory)
+                samples.append({'interaction': name, 'iteration': iteration, 'seconds': elapsed, 'peak_mib': peak})
+    finally:
+        if measure_memory:
+            tracemalloc.stop()
+    return samples
+
+def _percentile(values: list[float], percent: float) -> float:
+    """Linear-interpolated percentile of a non-empty list"""
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * percent / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+def summarise(samples: list[dict], label: str) -> list[dict]:
+    """Aggregate the samples into one row per interaction type"""
+    rows = []
+    created = datetime.now(timezone.utc).isoformat(timespec='seconds')
+    for name in dict.fromkeys(sample['interaction'] for sample in samples):
+        seconds = [s['seconds'] for s in samples if s['interaction'] == name]
+        peaks = [s['peak_mib'] for s in samples if s['interaction'] == name and s['peak_mib'] is not None]
+        rows.append({
+            'label': label,
+            'created': created,
+            'interaction': name,
+            'n': len(seconds),
+            'p50_s': round(_percentile(seconds, 50), 4),
+            'p95_s': round(_percentile(seconds, 95), 4),
+            'mean_s': round(statistics.fmean(seconds), 4),
+            'max_s': round(max(seconds), 4),
+            'peak_mib_p50': round(_percentile(peaks, 50), 2) if peaks else '',
+            'peak_mib_max': round(max(peaks), 2) if peaks else '',
+        })
+    return rows
+
+def _append_csv(path: Path, rows: list[dict]):
+    """Append rows to a CSV file, writing the header only when the file is new"""
+    is_new = not path.exists() or path.stat().st_size == 0
+    with open(path, 'a', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+        if is_new:
+            writer.writeheader()
+        writer.writerows(rows)
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure dashboard rerun latency per interaction type")
+    parser.add_argument('--interactions', nargs='+', choices=list(INTERACTIONS), default=list(INTERACTIONS))
+    parser.add_argument('--repeat', type=int, default=5, help="Reruns recorded per interaction type")
+    parser.add_argument('--timeout', type=float, default=300.0, help="Seconds allowed for a single rerun")
+    parser.add_argument('--no-memory', dest='memory', action='store_false',
+                        help="Skip tracemalloc (timings get closer to production, peak memory is not recorded)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--label', default='', help="Free text stored with every row, e.g. the git commit")
+    parser.add_argument('--output', type=Path, default=None, help="Append the summary table to this CSV file")
+    parser.add_argument('--samples', type=Path, default=None, help="Append every raw sample to this CSV file")
+    args = parser.parse_args(argv)
+
+    samples = collect_samples(args.interactions, args.repeat, args.timeout, args.memory, args.seed)
+    rows = summarise(samples, args.label)
+
+    columns = ['interaction', 'n', 'p50_s', 'p95_s', 'mean_s', 'max_s', 'peak_mib_p50', 'peak_mib_max']
+    print('| ' + ' | '.join(columns) + ' |')
+    print('|' + '---|' * len(columns))
+    for row in rows:
+        print('| ' + ' | '.join(str(row[column]) for column in columns) + ' |')
+
+    if args.output:
+        _append_csv(args.output, rows)
+    if args.samples:
+        _append_csv(args.samples, [{'label': args.label, **sample} for sample in samples])
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
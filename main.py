@@ -15,6 +15,10 @@ st.set_page_config(
 )
 
 def main():
+    # Start pre-loading the datasets and default figures while the first visitor is still on the landing page
+    from Component.warmup import start_warmup
+    start_warmup()
+
     # Create sidebar navigation
     st.sidebar.title("Navigation")
     